@@ -1,11 +1,21 @@
 # app.py
 import os
+import html
+import hashlib
 import shutil
 import io
-from flask import Flask, request, render_template, send_file, redirect, url_for, flash
+import time
+import tempfile
+import cProfile
+from flask import (Flask, Response, request, render_template, send_file, redirect, url_for, flash, jsonify,
+                   stream_with_context)
 from werkzeug.utils import secure_filename
-import pandas as pd
-from resume_ranker import rank_uploaded_resumes, allowed_file as rr_allowed_file
+from resume_ranker import (rank_uploaded_resumes, allowed_file as rr_allowed_file, cache_namespace, preload,
+                           parse_resume, skill_spans, get_skill_index)
+from resume_cache import ResumeCache, file_digest
+from jobs import JobStore, JobManager, QueueFull, new_job_id, is_job_id
+from results_store import ResultStore
+from metrics import METRICS, StageTimer
 
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt', 'html', 'htm'}
@@ -14,13 +24,105 @@ app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET", "dev-secret-key")
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB total (adjust as needed)
+app.config['MAX_RESUME_BYTES'] = int(os.environ.get("MAX_RESUME_MB", "10")) * 1024 * 1024  # per file
+app.config['RANKER_WORKERS'] = int(os.environ.get("RANKER_WORKERS", "1"))  # 0 = one per CPU core
+app.config['RESULTS_TOP_K'] = int(os.environ.get("RESULTS_TOP_K", "50"))   # 0 = show every candidate
+app.config['PROFILE_DIR'] = os.environ.get("PROFILE_DIR", "profiles")      # cProfile dumps (?profile=1 on upload)
+app.config['PREVIEW_CHARS'] = int(os.environ.get("PREVIEW_CHARS", "6000"))  # resume preview page size
+app.config['RANKER_STREAMING'] = os.environ.get("RANKER_STREAMING") == "1"  # memory-bounded ranking
 
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
+# The spaCy model and skill matcher load on the first upload. RANKER_PRELOAD=1
+# loads them at import instead; gunicorn.conf.py sets it together with
+# preload_app, so this happens once in the master and workers share the pages.
+if os.environ.get("RANKER_PRELOAD") == "1":
+    preload()
+
+# Parsed resumes survive across uploads (keyed by file content), so re-screening
+# the same pool against a new JD only recomputes the JD-dependent scoring.
+RESUME_CACHE_DIR = os.environ.get("RESUME_CACHE_DIR", ".resume_cache")
+RESUME_CACHE_MB = int(os.environ.get("RESUME_CACHE_MB", "512"))
+resume_cache = ResumeCache(RESUME_CACHE_DIR, namespace=cache_namespace(),
+                           max_bytes=RESUME_CACHE_MB * 1024 * 1024) if RESUME_CACHE_MB > 0 else None
+
 def allowed_file(filename):
     return rr_allowed_file(filename)  # use helper from resume_ranker
 
+
+# Ranking runs in background jobs; each job gets its own folder under uploads/,
+# and is handed the exact list of files it saved (no directory re-scan), so
+# concurrent uploads in any number of threads/processes never see each other's files.
+def job_folder(job_id):
+    return os.path.join(UPLOAD_FOLDER, job_id)
+
+# Each job's ranking is also kept column by column in its folder, for exports
+result_store = ResultStore(lambda job_id: os.path.join(job_folder(job_id), "results"))
+
+def save_upload(f, folder, chunk_size=1024 * 1024):
+    # Streams the upload to disk chunk by chunk; files over MAX_RESUME_BYTES are dropped
+    filename = secure_filename(f.filename)
+    if not filename:
+        return None
+    base, ext = os.path.splitext(filename)
+    save_path = os.path.join(folder, filename)
+    n = 1
+    while os.path.exists(save_path):  # same name twice in one batch
+        save_path = os.path.join(folder, f"{base}_{n}{ext}")
+        n += 1
+
+    limit = app.config['MAX_RESUME_BYTES']
+    written = 0
+    with open(save_path, 'wb') as out:
+        for chunk in iter(lambda: f.stream.read(chunk_size), b""):
+            written += len(chunk)
+            if written > limit:
+                break
+            out.write(chunk)
+    if written > limit:
+        os.remove(save_path)
+        return None
+    return save_path
+
+def run_ranking_job(job_id, progress, jd, paths, k=None, required_skills=None, profile=False):
+    timer = StageTimer()
+    # cProfile only sees this thread; with RANKER_WORKERS > 1 the parsing
+    # happens in worker processes and shows up as time waiting on the pool.
+    profiler = cProfile.Profile() if profile else None
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        ranked = rank_uploaded_resumes(paths, jd, workers=app.config['RANKER_WORKERS'],
+                                       cache=resume_cache, on_progress=progress,
+                                       k=k, required_skills=required_skills, timer=timer,
+                                       streaming=app.config['RANKER_STREAMING'])
+        with timer.stage("store_results"):
+            result_store.save(job_id, ranked)
+        return ranked
+    finally:
+        extra = {}
+        if profiler:
+            profiler.disable()
+            os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+            extra["profile"] = os.path.join(app.config['PROFILE_DIR'], f"{job_id}.prof")
+            profiler.dump_stats(extra["profile"])
+        METRICS.record(job_id, timer, wall_seconds=time.perf_counter() - start, **extra)
+
+def remove_job_folder(job_id):
+    shutil.rmtree(job_folder(job_id), ignore_errors=True)
+
+job_store = JobStore(os.environ.get("RANKER_JOBS_DB", os.path.join(UPLOAD_FOLDER, "jobs.sqlite3")))
+job_manager = JobManager(job_store, run_ranking_job,
+                         threads=int(os.environ.get("RANKER_JOB_THREADS", "2")),
+                         max_queued=int(os.environ.get("RANKER_JOB_QUEUE", "32")),
+                         timeout_seconds=int(os.environ.get("RANKER_JOB_TIMEOUT", "3600")),
+                         on_evict=remove_job_folder)
+
+def wants_json():
+    return request.accept_mimetypes.best == 'application/json'
+
 @app.route('/', methods=['GET'])
 def index():
     return render_template('index.html')
@@ -29,6 +131,9 @@ def index():
 def upload():
     jd = request.form.get('jd', '').strip()
     files = request.files.getlist('resumes')   # ✅ get ALL uploaded files
+    top_k = request.form.get('top_k', type=int, default=app.config['RESULTS_TOP_K'])
+    required_skills = [s.strip().lower() for s in request.form.get('required_skills', '').split(',') if s.strip()]
+    profile = request.values.get('profile') == '1'
 
     if not jd:
         flash("Please paste a job description.", "warning")
@@ -38,58 +143,170 @@ def upload():
         flash("Please upload at least one resume file.", "danger")
         return redirect(url_for('index'))
 
-    # Clear previous uploads
-    if os.path.exists(UPLOAD_FOLDER):
-        for f in os.listdir(UPLOAD_FOLDER):
-            os.remove(os.path.join(UPLOAD_FOLDER, f))
-    else:
-        os.makedirs(UPLOAD_FOLDER)
+    # A misspelt (or unmatchable, e.g. "node.js") must-have skill would filter out every candidate
+    unmatchable_skills = get_skill_index().unmatchable(required_skills)
+    if unmatchable_skills:
+        message = "Must-have skills that cannot be matched: {}".format(", ".join(unmatchable_skills))
+        if wants_json():
+            return jsonify(error=message), 400
+        flash(message + ". Check the spelling, or leave out skills with symbols or digits.", "warning")
+        return redirect(url_for('index'))
+
+    job_id = new_job_id()
+    folder = job_folder(job_id)
+    os.makedirs(folder)
 
     saved_files = []
+    rejected = []
     for f in files:
         if f and allowed_file(f.filename):
-            filename = secure_filename(f.filename)
-            save_path = os.path.join(UPLOAD_FOLDER, filename)
-            f.save(save_path)
-            saved_files.append(save_path)
+            save_path = save_upload(f, folder)
+            if save_path:
+                saved_files.append(save_path)
+            else:
+                rejected.append(f.filename)
+    if rejected:
+        flash("Skipped files over the {} MB limit: {}".format(
+            app.config['MAX_RESUME_BYTES'] // (1024 * 1024), ", ".join(rejected)), "warning")
 
     if not saved_files:
+        remove_job_folder(job_id)
         flash("No valid resume files were uploaded. Allowed: pdf, docx, txt, html, htm", "danger")
         return redirect(url_for('index'))
 
-    # Rank all uploaded resumes
-    from resume_ranker import rank_uploaded_resumes
-    ranked = rank_uploaded_resumes(UPLOAD_FOLDER, jd)
+    # Rank in the background; the browser polls /jobs/<id>
+    try:
+        job_manager.submit(job_id, meta={"jd": jd, "files": len(saved_files)}, jd=jd, paths=saved_files,
+                           k=top_k if top_k and top_k > 0 else None, required_skills=required_skills,
+                           profile=profile)
+    except QueueFull:
+        remove_job_folder(job_id)
+        if wants_json():
+            return jsonify(error="Server is busy, please retry shortly."), 503
+        flash("The server is busy ranking other batches. Please try again shortly.", "warning")
+        return redirect(url_for('index'))
+
+    if wants_json():
+        return jsonify(job_id=job_id, status_url=url_for('job_status', job_id=job_id),
+                       results_url=url_for('job_results', job_id=job_id),
+                       download_url=url_for('download', job=job_id)), 202
+    return redirect(url_for('job_results', job_id=job_id))
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify(error="Unknown job"), 404
+    job.pop("meta")
+    return jsonify(job)
+
+
+@app.route('/jobs/<job_id>/results')
+def job_results(job_id):
+    job = job_store.get(job_id, with_result=True)
+    if job is None:
+        flash("That ranking job no longer exists.", "warning")
+        return redirect(url_for('index'))
+    if job["status"] == "failed":
+        flash(f"Ranking failed: {job['error']}", "danger")
+        return redirect(url_for('index'))
+    if job["status"] != "done":
+        return render_template('job.html', job=job)
+    return render_template('results.html', jd=job["meta"]["jd"], ranked=job["result"] or [], job_id=job_id)
+
 
-    return render_template('results.html', jd=jd, ranked=ranked)
+@app.route('/metrics')
+def metrics():
+    # Stage timings for this worker process; ?job=<id> for a single recent job
+    job_id = request.args.get('job')
+    if job_id:
+        entry = METRICS.get(job_id)
+        if entry is None:
+            return jsonify(error="No metrics for that job in this worker"), 404
+        return jsonify(entry)
+    return jsonify(METRICS.snapshot())
 
 
 @app.route('/download')
 def download():
-    csv_path = os.path.join(app.config['UPLOAD_FOLDER'], "ranking_results.csv")
-    if not os.path.exists(csv_path):
+    # /download?job=<id>[&format=xlsx] -- streamed from the stored results, nothing is re-ranked
+    job_id = request.args.get('job', '')
+    fmt = request.args.get('format', 'csv')
+    if not is_job_id(job_id) or not result_store.exists(job_id):
         flash("No results file found. Please upload and rank resumes first.", "warning")
         return redirect(url_for('index'))
-    return send_file(csv_path, as_attachment=True, download_name="resume_ranking_results.csv")
+    if fmt == 'xlsx':
+        out = tempfile.TemporaryFile()
+        result_store.write_xlsx(job_id, out)
+        out.seek(0)
+        return send_file(out, as_attachment=True, download_name="resume_ranking_results.xlsx",
+                         mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    return Response(stream_with_context(result_store.iter_csv(job_id)), mimetype='text/csv',
+                    headers={"Content-Disposition": "attachment; filename=resume_ranking_results.csv"})
 
 @app.route('/view_resume')
 def view_resume():
-    # returns plain text of a resume for preview (safe: reads from uploads)
-    filepath = request.args.get('path', '')
-    if not filepath:
+    # Resume preview, one page of characters at a time, served from the text
+    # extracted while ranking (resume cache, keyed by file hash) instead of
+    # re-parsing the file on every click:
+    #   /view_resume?job=<job_id>&file=<name>[&offset=0][&limit=N][&format=json]
+    job_id = request.args.get('job', '')
+    file_name = secure_filename(request.args.get('file', ''))
+    offset = max(0, request.args.get('offset', type=int, default=0))
+    limit = min(max(1, request.args.get('limit', type=int, default=app.config['PREVIEW_CHARS'])), 100_000)
+    fmt = request.args.get('format', 'html')
+    if not is_job_id(job_id) or not file_name:
         return "No file specified.", 400
-    # ensure path inside uploads
-    uploads_abs = os.path.abspath(app.config['UPLOAD_FOLDER'])
-    target_abs = os.path.abspath(filepath)
-    if not target_abs.startswith(uploads_abs):
-        return "Unauthorized path", 403
-    if not os.path.exists(target_abs):
+
+    # The cache key always comes from the file in this job's folder, never from the client
+    path = os.path.join(job_folder(job_id), file_name)
+    if not os.path.isfile(path):
         return "File not found", 404
+    doc_id = file_digest(path)
+
+    # Same file + same page = same bytes, so repeat views are answered with a 304
+    etag = hashlib.sha1(f"{cache_namespace()}|{doc_id}|{offset}|{limit}|{fmt}".encode("utf-8")).hexdigest()
+    if request.if_none_match.contains(etag):
+        return preview_response(Response(status=304), etag)
+
+    entry = resume_cache.get(doc_id) if resume_cache is not None else None
+    if entry is None:
+        # Cache disabled or entry evicted: parse once more (and keep it)
+        entry = parse_resume(path)
+        if resume_cache is not None:
+            resume_cache.put(doc_id, entry)
+
+    text = entry["raw_text"]
+    page = text[offset:offset + limit]
+    spans = skill_spans(page, entry["skills"])
+    next_offset = offset + limit if offset + limit < len(text) else None
+    if fmt == 'json':
+        return preview_response(jsonify(file=file_name, offset=offset, limit=limit, total=len(text), text=page,
+                                        highlights=spans, next_offset=next_offset), etag)
+
+    parts, last = [], 0
+    for start, end in spans:
+        parts.append(html.escape(page[last:start]))
+        parts.append("<mark>{}</mark>".format(html.escape(page[start:end])))
+        last = end
+    parts.append(html.escape(page[last:]))
+
+    def page_link(label, new_offset):
+        return "<a href='{}'>{}</a>".format(html.escape(url_for('view_resume', job=job_id, file=file_name,
+                                                                offset=new_offset, limit=limit)), label)
+    nav = ["Characters {}–{} of {}".format(offset + 1 if page else 0, offset + len(page), len(text))]
+    if offset > 0:
+        nav.append(page_link("← Previous", max(0, offset - limit)))
+    if next_offset is not None:
+        nav.append(page_link("Next →", next_offset))
+    body = "<div>{}</div><pre style='white-space:pre-wrap'>{}</pre>".format(" · ".join(nav), "".join(parts))
+    return preview_response(Response(body, mimetype="text/html"), etag)
 
-    # we'll re-use resume_ranker.extract_text_from_file to get cleaned text
-    from resume_ranker import extract_text_from_file
-    text = extract_text_from_file(target_abs)
-    return "<pre style='white-space:pre-wrap'>{}</pre>".format(text.replace("<", "&lt;").replace(">", "&gt;"))
+def preview_response(response, etag):
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, max-age=86400"
+    return response
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
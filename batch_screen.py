@@ -0,0 +1,333 @@
+# batch_screen.py
+# Headless batch screening for resume collections too large for the web app.
+#
+#   python batch_screen.py resumes/ --jd jd.txt --out results/
+#   python batch_screen.py applicants.zip --jd jds/ --out results/ --workers 8 --format parquet
+#
+# The input (a directory, searched recursively, or a zip/tar archive) is
+# streamed in chunks: each chunk is parsed in parallel, its text is added to
+# a persistent TF-IDF index (resume_index.ResumeIndex) and only the small
+# per-resume fields are kept, so memory does not grow with the text of the
+# whole corpus. All JDs are then scored against the parsed corpus at once
+# (resume_ranker.rank_resumes_multi).
+# After each chunk the chunk's index rows and parsed fields are appended to
+# the checkpoint in the state directory; re-running the same command resumes
+# where a crashed run stopped.
+import argparse
+import csv
+import itertools
+import json
+import os
+import shutil
+import tarfile
+import time
+import zipfile
+
+from resume_ranker import (allowed_file, clean_text, extract_skills_from_text, parse_sources, make_parse_pool,
+                           build_resume_record, rank_resumes_multi, source_digest, preload,
+                           cache_namespace, get_skill_index)
+from resume_cache import ResumeCache
+from resume_index import ResumeIndex
+
+DEFAULT_CHUNK = 256
+DEFAULT_MAX_FILE_MB = 10
+OUTPUT_COLUMNS = ["rank", "name", "email", "phone", "file", "score", "skills"]
+
+
+# =============================
+# Input: directory or archive
+# =============================
+def iter_directory(folder):
+    # Sorted walk, so a resumed run sees files in the same order
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for name in sorted(files):
+            if allowed_file(name):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, folder), path
+
+
+def iter_zip(path, max_bytes, skip=0):
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            if info.is_dir() or not allowed_file(info.filename):
+                continue
+            if info.file_size > max_bytes:
+                print(f"⚠ Skipping {info.filename}: larger than {max_bytes // (1024 * 1024)} MB")
+                continue
+            if skip:  # already in the checkpoint: counted, never decompressed
+                skip -= 1
+                continue
+            yield info.filename, (info.filename, zf.read(info))
+
+
+def iter_tar(path, max_bytes, skip=0):
+    # Stream mode ("r|*"): members are read in order, compressed or not,
+    # without the random access (and full decompression) a tar index needs
+    with tarfile.open(path, "r|*") as tf:
+        for member in tf:
+            if not member.isfile() or not allowed_file(member.name):
+                continue
+            if member.size > max_bytes:
+                print(f"⚠ Skipping {member.name}: larger than {max_bytes // (1024 * 1024)} MB")
+                continue
+            if skip:  # already in the checkpoint: passed over without being extracted
+                skip -= 1
+                continue
+            yield member.name, (member.name, tf.extractfile(member).read())
+
+
+def iter_input(path, max_bytes=DEFAULT_MAX_FILE_MB * 1024 * 1024, skip=0):
+    # Yields (relative name, source); a source is a path or (filename, bytes).
+    # The first `skip` sources are left out without being read.
+    if os.path.isdir(path):
+        return itertools.islice(iter_directory(path), skip, None)
+    if zipfile.is_zipfile(path):
+        return iter_zip(path, max_bytes, skip)
+    if tarfile.is_tarfile(path):
+        return iter_tar(path, max_bytes, skip)
+    raise SystemExit(f"{path} is not a directory, zip or tar archive")
+
+
+def iter_chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_jds(paths):
+    # Each --jd is a text file or a folder of .txt files; names come from the file stem
+    jds = []
+    for path in paths:
+        files = ([os.path.join(path, f) for f in sorted(os.listdir(path)) if f.lower().endswith(".txt")]
+                 if os.path.isdir(path) else [path])
+        for file_path in files:
+            with open(file_path, encoding="utf-8", errors="ignore") as f:
+                jds.append((os.path.splitext(os.path.basename(file_path))[0], f.read()))
+    if not jds:
+        raise SystemExit("No job descriptions found")
+    return jds
+
+
+# =============================
+# Checkpoints
+# =============================
+# state/checkpoint.json   input path, sources consumed, docs.jsonl size, index deltas
+# state/docs.jsonl        one line of contact fields + matched skills per resume
+# state/index/rows-<n>/   ResumeIndex.save_delta() of the chunk that ended at source n
+class Checkpoint:
+    def __init__(self, state_dir, input_path):
+        self.state_dir = state_dir
+        self.input_path = os.path.abspath(input_path)
+        self.docs_path = os.path.join(state_dir, "docs.jsonl")
+        self.meta_path = os.path.join(state_dir, "checkpoint.json")
+        self.index_path = os.path.join(state_dir, "index")
+        self.consumed = 0
+        self.deltas = []
+        self.docs = []
+        self.index = ResumeIndex()
+        self._unsaved = []      # doc ids added to the index since the last save
+        self._saved_terms = 0   # vocabulary size at the last save
+
+    def load(self):
+        if not os.path.exists(self.meta_path):
+            # A run that died before its first checkpoint may have left docs
+            # behind; nothing of it is in an index, so it starts over
+            if os.path.exists(self.docs_path):
+                os.remove(self.docs_path)
+            return False
+        with open(self.meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["input"] != self.input_path:
+            raise SystemExit(f"{self.state_dir} holds a run over {meta['input']}; use another --state dir")
+        self.consumed = meta["consumed"]
+        self.deltas = meta["deltas"]
+        # Deltas written after the last checkpoint belong to an unfinished chunk
+        for name in set(os.listdir(self.index_path)) - set(self.deltas):
+            shutil.rmtree(os.path.join(self.index_path, name), ignore_errors=True)
+        self.index = ResumeIndex.load_deltas([os.path.join(self.index_path, name) for name in self.deltas])
+        self._saved_terms = len(self.index.vocabulary)
+        # Lines appended after the last checkpoint belong to an unfinished chunk
+        with open(self.docs_path, "r+b") as f:
+            f.truncate(meta["docs_bytes"])
+        with open(self.docs_path, encoding="utf-8") as f:
+            self.docs = [json.loads(line) for line in f]
+        return True
+
+    def add(self, docs):
+        os.makedirs(self.state_dir, exist_ok=True)
+        with open(self.docs_path, "a", encoding="utf-8") as f:
+            for doc in docs:
+                f.write(json.dumps(doc) + "\n")
+        self.docs.extend(docs)
+        self._unsaved.extend(doc["id"] for doc in docs)
+
+    def save(self, consumed):
+        # Only the rows added since the last save are written, then
+        # checkpoint.json is swapped in atomically: a crash at any point
+        # leaves the previous checkpoint usable
+        name = f"rows-{consumed}"
+        self.index.save_delta(os.path.join(self.index_path, name), self._unsaved, self._saved_terms)
+        meta = {"input": self.input_path, "consumed": consumed, "deltas": self.deltas + [name],
+                "docs_bytes": os.path.getsize(self.docs_path), "saved": time.time()}
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.meta_path)
+        self.consumed = consumed
+        self.deltas.append(name)
+        self._unsaved = []
+        self._saved_terms = len(self.index.vocabulary)
+
+
+# =============================
+# Output
+# =============================
+class CsvWriter:
+    def __init__(self, path):
+        self.f = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.f, fieldnames=OUTPUT_COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetWriter:
+    # Optional: needs pyarrow; each write() becomes one row group
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("--format parquet needs pyarrow (pip install pyarrow)")
+        self.pa = pa
+        self.schema = pa.schema([("rank", pa.int64()), ("name", pa.string()), ("email", pa.string()),
+                                 ("phone", pa.string()), ("file", pa.string()), ("score", pa.float64()),
+                                 ("skills", pa.string())])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        columns = {c: [row[c] for row in rows] for c in OUTPUT_COLUMNS}
+        self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {"csv": CsvWriter, "parquet": ParquetWriter}
+
+
+def write_ranking(path, ranked, fmt, batch_size=10_000):
+    writer = WRITERS[fmt](path)
+    try:
+        for i in range(0, len(ranked), batch_size):
+            writer.write([{"rank": r["rank"], "name": r["name"], "email": r["email"], "phone": r["phone"],
+                           "file": r["basename"], "score": r["score"], "skills": "; ".join(r["skills"])}
+                          for r in ranked[i:i + batch_size]])
+    finally:
+        writer.close()
+
+
+# =============================
+# Batch run
+# =============================
+def ingest(input_path, checkpoint, workers=1, chunk_size=DEFAULT_CHUNK, cache=None,
+           max_bytes=DEFAULT_MAX_FILE_MB * 1024 * 1024):
+    # Parses every resume not yet in the checkpoint and adds it to the index
+    consumed = checkpoint.consumed
+    items = iter_input(input_path, max_bytes, skip=consumed)
+    pool = make_parse_pool(workers) if workers != 1 else None
+    start, start_consumed = time.perf_counter(), consumed
+    try:
+        for chunk in iter_chunks(items, chunk_size):
+            names = [name for name, _ in chunk]
+            sources = [source for _, source in chunk]
+            digests, parsed = parse_sources(sources, workers=workers, cache=cache, pool=pool, show_progress=False)
+            docs = []
+            for name, source, digest, entry in zip(names, sources, digests, parsed):
+                doc_id = digest or source_digest(source)
+                checkpoint.index.add(doc_id, entry["text"])
+                docs.append({"id": doc_id, "file": name, "name": entry["name"], "email": entry["email"],
+                             "phone": entry["phone"], "skills": entry["skills"]})
+            checkpoint.add(docs)
+            consumed += len(chunk)
+            checkpoint.save(consumed)
+            rate = (consumed - start_consumed) / (time.perf_counter() - start)
+            print(f"📄 {consumed} resumes indexed ({rate:.1f} files/s)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def screen_corpus(checkpoint, jds, out_dir, fmt="csv", k=None, required_skills=None):
+    # Scores all JDs against the indexed corpus in one pass; one output file per JD
+    os.makedirs(out_dir, exist_ok=True)
+    records = []
+    for doc in checkpoint.docs:
+        # Text is already in the index, so records carry none
+        record = build_resume_record(doc["file"], {**doc, "text": ""}, [], digest=doc["id"], jd_related=-1)
+        record["file"] = doc["file"]
+        records.append(record)
+    jd_texts = [jd_text for _, jd_text in jds]
+    jd_skills_list = [extract_skills_from_text(clean_text(jd_text)) for jd_text in jd_texts]
+    rankings = rank_resumes_multi(records, jd_texts, jd_skills_list, index=checkpoint.index, k=k,
+                                  required_skills=required_skills)
+    outputs = []
+    for (jd_name, _), ranked in zip(jds, rankings):
+        path = os.path.join(out_dir, f"{jd_name}.{fmt}")
+        write_ranking(path, ranked, fmt)
+        print(f"✅ {jd_name}: {len(ranked)} candidates -> {path}")
+        outputs.append(path)
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen a directory or archive of resumes against job descriptions")
+    parser.add_argument("input", help="folder (searched recursively), .zip or .tar[.gz|.bz2|.xz]")
+    parser.add_argument("--jd", action="append", required=True,
+                        help="job description .txt file or folder of them; repeat for several JDs")
+    parser.add_argument("--out", default="batch_results", help="output folder, one file per JD")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="csv")
+    parser.add_argument("--state", help="checkpoint folder (default: <out>/.state)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--workers", type=int, default=0, help="parser processes (0 = one per CPU core)")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="resumes parsed per checkpoint")
+    parser.add_argument("--top-k", type=int, default=0, help="only write the k best per JD (0 = all)")
+    parser.add_argument("--required-skills", default="", help="comma-separated must-have skills")
+    parser.add_argument("--max-file-mb", type=int, default=DEFAULT_MAX_FILE_MB)
+    parser.add_argument("--cache-dir", help="reuse/populate a parsed-resume cache (see RESUME_CACHE_DIR)")
+    args = parser.parse_args(argv)
+    required = [s.strip().lower() for s in args.required_skills.split(",") if s.strip()]
+    unmatchable_skills = get_skill_index().unmatchable(required)
+    if unmatchable_skills:
+        parser.error("--required-skills that cannot be matched: " + ", ".join(unmatchable_skills))
+
+    jds = read_jds(args.jd)
+    state_dir = args.state or os.path.join(args.out, ".state")
+    if args.restart:
+        shutil.rmtree(state_dir, ignore_errors=True)
+    checkpoint = Checkpoint(state_dir, args.input)
+    if checkpoint.load():
+        print(f"↻ Resuming after {checkpoint.consumed} resumes from {state_dir}")
+
+    cache = None
+    if args.cache_dir:
+        cache = ResumeCache(args.cache_dir, namespace=cache_namespace())
+
+    preload(freeze=False)  # load the model once, before forking parser processes
+    ingest(args.input, checkpoint, workers=args.workers, chunk_size=args.chunk, cache=cache,
+           max_bytes=args.max_file_mb * 1024 * 1024)
+    screen_corpus(checkpoint, jds, args.out, fmt=args.format, k=args.top_k or None, required_skills=required)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,780 @@
+# benchmark.py
+# Rough throughput numbers for the resume pipeline.
+#   python benchmark.py workers <resume_folder> --jd jd.txt --workers 1 2 4 8
+#   python benchmark.py index --sizes 1000 10000 100000
+#   python benchmark.py spacy --docs 500
+#   python benchmark.py startup --workers 4
+#   python benchmark.py clean --docs 2000 [--folder resumes/]
+#   python benchmark.py jds --resumes 5000 --jds 20
+#   python benchmark.py pool --resumes 5000 --updates 200
+#   python benchmark.py memory --resumes 5000 [--folder corpus/]
+#   python benchmark.py generate corpus/ --resumes 1000 --formats txt docx pdf
+#   python benchmark.py suite --resumes 60 --out bench.json [--compare baseline.json]
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from resume_ranker import (process_resumes, list_resume_files, clean_text, extract_contact_info,
+                           extract_text_from_file, extract_skills_from_text, extract_skills_batch,
+                           build_resume_record, rank_resumes, rank_resumes_multi, rank_uploaded_resumes,
+                           category_skills, all_known_skills, SPACY_MODEL, NLP_HEAVY_COMPONENTS)
+from resume_index import ResumeIndex
+from candidate_pool import CandidatePool
+
+FILLER_WORDS = ("experience team project worked managed developed responsible delivered "
+                "years company client improved led built support reporting").split()
+
+
+def synthetic_texts(n, seed=0, skills_per_doc=12, filler_per_doc=150):
+    # Cleaned-looking resume texts drawn from the skill dictionary
+    rng = random.Random(seed)
+    categories = list(category_skills)
+    texts = []
+    for _ in range(n):
+        skills = category_skills[rng.choice(categories)]
+        words = [rng.choice(skills) for _ in range(skills_per_doc)]
+        words += [rng.choice(FILLER_WORDS) for _ in range(filler_per_doc)]
+        rng.shuffle(words)
+        texts.append(clean_text(" ".join(words)))
+    return texts
+
+
+# =============================
+# Parallel extraction: files/sec vs worker count
+# =============================
+def bench_workers(folder, jd_text, worker_counts, repeat=1):
+    jd_skills = extract_skills_from_text(clean_text(jd_text))
+    n_files = len(list_resume_files(folder))
+    results = []
+    for workers in worker_counts:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            process_resumes(folder, jd_skills, workers=workers)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results.append({"workers": workers, "files": n_files, "seconds": round(best, 3),
+                        "files_per_sec": round(n_files / best, 1) if best else 0.0})
+    return results
+
+
+# =============================
+# Persistent index vs per-query refit
+# =============================
+def bench_index(sizes, n_queries=20, k=50, seed=0):
+    jds = synthetic_texts(n_queries, seed=seed + 1, skills_per_doc=20, filler_per_doc=40)
+    results = []
+    for size in sizes:
+        texts = synthetic_texts(size, seed=seed)
+
+        start = time.perf_counter()
+        index = ResumeIndex()
+        for i, text in enumerate(texts):
+            index.add(i, text)
+        index.query(jds[0], k=k)  # first query builds the normalised matrix
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for jd in jds:
+            index.query(jd, k=k)
+        indexed = (time.perf_counter() - start) / len(jds)
+
+        # Current path: refit the vectorizer for every JD
+        refit_queries = jds[:max(1, min(len(jds), 200_000 // size))]
+        start = time.perf_counter()
+        for jd in refit_queries:
+            tfidf = TfidfVectorizer(stop_words='english').fit_transform([jd] + texts)
+            sims = cosine_similarity(tfidf[0:1], tfidf[1:]).flatten()
+            np.argsort(-sims)[:k]
+        refit = (time.perf_counter() - start) / len(refit_queries)
+
+        results.append({"resumes": size, "index_build_s": round(build, 3),
+                        "refit_ms": round(refit * 1000, 2), "index_ms": round(indexed * 1000, 2),
+                        "speedup": round(refit / indexed, 1) if indexed else 0.0})
+    return results
+
+
+# =============================
+# spaCy: full pipeline per doc vs tokenizer-only nlp.pipe
+# =============================
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource  # peak, not current, outside Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _spacy_child(mode, corpus_path):
+    # Runs in a fresh interpreter so model RSS is not shared between modes
+    import spacy
+    from spacy.matcher import PhraseMatcher
+    with open(corpus_path, encoding="utf-8") as f:
+        corpus = json.load(f)
+    base = rss_mb()
+    if mode == "full":
+        model = spacy.load(SPACY_MODEL)
+    else:
+        model = spacy.load(SPACY_MODEL, exclude=NLP_HEAVY_COMPONENTS)
+    skill_matcher = PhraseMatcher(model.vocab, attr="LOWER")
+    skill_matcher.add("SKILLS", [model.make_doc(s) for s in corpus["skills"]])
+    loaded = rss_mb()
+
+    start = time.perf_counter()
+    if mode == "full":
+        out = [sorted({d[a:b].text for _, a, b in skill_matcher(d)})
+               for d in (model(t.lower()) for t in corpus["texts"])]
+    else:
+        out = [sorted({d[a:b].text for _, a, b in skill_matcher(d)})
+               for d in model.pipe((t.lower() for t in corpus["texts"]), batch_size=64)]
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"mode": mode, "ms_per_doc": round(elapsed * 1000 / len(out), 3),
+                      "model_rss_mb": round(loaded - base, 1),
+                      "matches": sum(map(len, out))}))
+
+
+def bench_spacy(n_docs, seed=0):
+    texts = synthetic_texts(n_docs, seed=seed, filler_per_doc=400)
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump({"texts": texts, "skills": all_known_skills}, f)
+    try:
+        results = []
+        for mode in ("full", "fast"):
+            out = subprocess.run([sys.executable, __file__, "_spacy_child", mode, f.name],
+                                 check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(out.strip().splitlines()[-1]))
+        return results
+    finally:
+        os.remove(f.name)
+
+
+# =============================
+# Startup: import time, model load and per-worker memory
+# =============================
+# Runs via `python -c` in a fresh interpreter, so nothing is imported
+# beforehand. The parent imports resume_ranker (and with "preload" loads the
+# model), then forks workers the way gunicorn does; each worker matches one
+# text and reports the memory it does not share with anybody (Linux only).
+STARTUP_CHILD = r"""
+import json, os, sys, time
+
+def mem_mb():
+    rss = private = 0
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] == "Rss:":
+                rss = int(parts[1])
+            elif parts[0] in ("Private_Clean:", "Private_Dirty:"):
+                private += int(parts[1])
+    return rss / 1024, private / 1024
+
+mode, n_workers, text = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+start = time.perf_counter()
+import resume_ranker
+import_s = time.perf_counter() - start
+import_rss = mem_mb()[0]
+start = time.perf_counter()
+if mode == "preload":
+    resume_ranker.preload()
+preload_s = time.perf_counter() - start
+
+readers = []
+for _ in range(n_workers):
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        start = time.perf_counter()
+        resume_ranker.extract_skills_from_text(text)
+        first_s = time.perf_counter() - start
+        os.write(w, json.dumps([first_s, mem_mb()[1]]).encode())
+        os._exit(0)
+    os.close(w)
+    readers.append((pid, r))
+workers = []
+for pid, r in readers:
+    with os.fdopen(r) as f:
+        workers.append(json.loads(f.read()))
+    os.waitpid(pid, 0)
+
+print(json.dumps({"import_s": round(import_s, 3), "preload_s": round(preload_s, 3),
+                  "import_rss_mb": round(import_rss, 1),
+                  "first_call_s": round(max(w[0] for w in workers), 3),
+                  "worker_private_mb": round(sum(w[1] for w in workers) / len(workers), 1)}))
+"""
+
+
+def bench_startup(n_workers=4):
+    if not os.path.exists("/proc/self/smaps_rollup") or not hasattr(os, "fork"):
+        raise SystemExit("startup benchmark needs Linux (fork + /proc/self/smaps_rollup)")
+    text = " ".join(all_known_skills[:50])
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for mode in ("lazy", "preload"):
+        # Fresh model cache per mode: the first run builds it, the second loads it
+        cache_dir = tempfile.mkdtemp(prefix="model_cache_")
+        try:
+            for model_cache in ("cold", "warm"):
+                env = dict(os.environ, RESUME_MODEL_CACHE=cache_dir)
+                out = subprocess.run([sys.executable, "-c", STARTUP_CHILD, mode, str(n_workers), text],
+                                     check=True, capture_output=True, text=True, cwd=here, env=env).stdout
+                row = {"mode": mode, "model_cache": model_cache, "workers": n_workers}
+                row.update(json.loads(out.strip().splitlines()[-1]))
+                results.append(row)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+
+# =============================
+# Text cleaning: golden check + timing against the original implementation
+# =============================
+def legacy_clean_text(text):
+    # clean_text before the single-pass rewrite; kept as the reference output
+    from bs4 import BeautifulSoup
+    if not isinstance(text, str):
+        return ""
+    text = BeautifulSoup(text, "html.parser").get_text()
+    text = text.lower()
+    text = re.sub(r'\S*@\S*\s?', '', text)
+    text = re.sub(r'http\S+|www\S+|https\S+', '', text)
+    text = re.sub(r'[^a-z\s]', ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+
+def legacy_extract_contact_info(text):
+    name = email = phone = "Not Found"
+    email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', text)
+    if email_match:
+        email = email_match.group(0)
+    phone_match = re.search(r'(\+?\d{1,3}[-\s]?)?\d{10}', text)
+    if phone_match:
+        phone = phone_match.group(0)
+    for line in text.split('\n'):
+        if 2 <= len(line.split()) <= 4 and line.split()[0][0].isupper():
+            name = line.strip()
+            break
+    return name, email, phone
+
+
+EDGE_TOKENS = ["jane.doe@example.com", "a@b", "@", "x@y.org,", "http://x.io/a?b=1", "https://t.co",
+               "www.site.com", "xxhttp://a", "+91 9876543210", "(555) 123-4567", "C++", "C#", "Node.js",
+               "&amp;", "&nbsp;", "<b>", "</p>", "<br/>", "\r\n", "\t", "\xa0", "é", "İ", "ß", "--", "...", "2019-2023"]
+
+
+def raw_resume_texts(n, seed=0):
+    # Raw (uncleaned) extractor-like output: a name line, contacts, skills,
+    # filler and a sprinkling of emails/URLs/markup/unicode edge cases
+    rng = random.Random(seed)
+    categories = list(category_skills)
+    texts = []
+    for i in range(n):
+        lines = [f"Candidate {i}" if rng.random() < 0.8 else f"candidate number {i} resume",
+                 f"cand{i}@mail.com | +1 {rng.randrange(10**9, 10**10)}"]
+        for _ in range(rng.randint(5, 30)):
+            words = [rng.choice(category_skills[rng.choice(categories)]).title() if rng.random() < 0.2
+                     else rng.choice(FILLER_WORDS) for _ in range(rng.randint(3, 15))]
+            if rng.random() < 0.1:
+                words.append(rng.choice(EDGE_TOKENS))
+            rng.shuffle(words)
+            lines.append(" ".join(words))
+        texts.append("\n".join(lines))
+    return texts
+
+
+def bench_clean(n_docs, folder=None, repeat=3, seed=0):
+    texts = raw_resume_texts(n_docs, seed=seed)
+    if folder:
+        texts += [extract_text_from_file(path) for path in list_resume_files(folder)]
+
+    mismatches = [t for t in texts
+                  if clean_text(t) != legacy_clean_text(t)
+                  or extract_contact_info(t) != legacy_extract_contact_info(t)]
+    if mismatches:
+        print(f"✗ {len(mismatches)} of {len(texts)} texts differ from the reference, first one:")
+        print(repr(mismatches[0][:500]))
+        raise SystemExit(1)
+    print(f"✓ {len(texts)} texts: output identical to the reference implementation")
+
+    results = []
+    for label, func in (("clean_text", clean_text), ("legacy_clean_text", legacy_clean_text),
+                        ("contact_info", extract_contact_info),
+                        ("legacy_contact_info", legacy_extract_contact_info)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for t in texts:
+                func(t)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results.append({"function": label, "docs": len(texts),
+                        "us_per_doc": round(best * 1e6 / len(texts), 1)})
+    return results
+
+
+# =============================
+# Several JDs: one rank_resumes call per JD vs rank_resumes_multi
+# =============================
+def bench_jds(n_resumes, n_jds, k=50, seed=0):
+    texts = synthetic_texts(n_resumes, seed=seed)
+    jds = synthetic_texts(n_jds, seed=seed + 1, skills_per_doc=20, filler_per_doc=40)
+    jd_skills_list = [extract_skills_from_text(jd) for jd in jds]
+    parsed = [{"text": t, "skills": s, "name": f"Candidate {i}", "email": "Not Found", "phone": "Not Found"}
+              for i, (t, s) in enumerate(zip(texts, extract_skills_batch(texts)))]
+
+    start = time.perf_counter()
+    for jd, jd_skills in zip(jds, jd_skills_list):
+        records = [build_resume_record(f"r{i}.txt", p, jd_skills) for i, p in enumerate(parsed)]
+        rank_resumes(records, jd, jd_skills, k=k)
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    records = [build_resume_record(f"r{i}.txt", p, [], jd_related=-1) for i, p in enumerate(parsed)]
+    rank_resumes_multi(records, jds, jd_skills_list, k=k)
+    multi = time.perf_counter() - start
+    return [{"resumes": n_resumes, "jds": n_jds, "per_jd_loop_s": round(loop, 3),
+             "multi_s": round(multi, 3), "speedup": round(loop / multi, 1) if multi else 0.0}]
+
+
+# =============================
+# Candidate pool: one hot add/withdraw vs re-ranking the whole pool
+# =============================
+def bench_pool(n_resumes, n_updates=200, seed=0):
+    texts = synthetic_texts(n_resumes + n_updates, seed=seed)
+    jd = synthetic_texts(1, seed=seed + 1, skills_per_doc=20, filler_per_doc=40)[0]
+    jd_skills = extract_skills_from_text(jd)
+    parsed = [{"text": t, "skills": s, "name": f"Candidate {i}", "email": "Not Found", "phone": "Not Found"}
+              for i, (t, s) in enumerate(zip(texts, extract_skills_batch(texts)))]
+    pool = CandidatePool(jd)
+    for i, p in enumerate(parsed[:n_resumes]):
+        pool.add_parsed(f"d{i}", f"r{i}.txt", p)
+    pool.rescore()
+
+    rescores = 0
+    add_times, withdraw_times = [], []
+    for i in range(n_resumes, n_resumes + n_updates):
+        ref_n = pool._ref_n
+        start = time.perf_counter()
+        pool.add_parsed(f"d{i}", f"r{i}.txt", parsed[i])
+        add_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        pool.withdraw(f"d{i - n_resumes}")
+        withdraw_times.append(time.perf_counter() - start)
+        rescores += pool._ref_n != ref_n
+
+    # The alternative: rank the whole pool again after every change
+    records = [build_resume_record(f"r{i}.txt", p, jd_skills) for i, p in enumerate(parsed[:n_resumes])]
+    start = time.perf_counter()
+    rank_resumes(records, jd, jd_skills)
+    rerank = time.perf_counter() - start
+
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, "pool")
+        start = time.perf_counter()
+        pool.save(path)
+        save = time.perf_counter() - start
+        start = time.perf_counter()
+        CandidatePool.load(path).ranking(50)
+        load = time.perf_counter() - start
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return [{"resumes": n_resumes, "add_p50_ms": round(1000 * float(np.median(add_times)), 2),
+             "withdraw_p50_ms": round(1000 * float(np.median(withdraw_times)), 2),
+             "full_rerank_ms": round(1000 * rerank, 1), "rescores": rescores,
+             "save_s": round(save, 3), "load_top50_s": round(load, 3)}]
+
+
+# =============================
+# Peak memory: rank_uploaded_resumes with and without streaming
+# =============================
+def _memory_child(mode, folder, jd_path, workers):
+    # Runs in a fresh interpreter so each mode starts from the same baseline
+    import resource
+    with open(jd_path, encoding="utf-8") as f:
+        jd_text = f.read()
+    files = list_resume_files(folder)
+    extract_skills_from_text(clean_text(jd_text))  # load the model before measuring
+    base = rss_mb()
+    start = time.perf_counter()
+    ranked = rank_uploaded_resumes(files, jd_text, workers=workers, k=50, streaming=mode == "streaming")
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    print(json.dumps({"mode": mode, "resumes": len(files), "seconds": round(elapsed, 2),
+                      "peak_rss_mb": round(peak, 1), "peak_growth_mb": round(peak - base, 1),
+                      "top": ranked[0]["basename"] if ranked else None}))
+
+
+def bench_memory(n_resumes, folder=None, workers=1, seed=0):
+    tmp = None
+    if folder is None:
+        tmp = folder = tempfile.mkdtemp()
+        write_corpus(folder, n_resumes, formats=("txt",), n_jds=1, seed=seed)
+    try:
+        jd_dir = os.path.join(folder, "jds")
+        jd_path = os.path.join(jd_dir, sorted(os.listdir(jd_dir))[0])
+        results = []
+        for mode in ("full", "streaming"):
+            out = subprocess.run([sys.executable, __file__, "_memory_child", mode, folder, jd_path,
+                                  "--workers", str(workers)],
+                                 check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(out.strip().splitlines()[-1]))
+        return results
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+# =============================
+# Synthetic corpus: txt / docx / pdf resumes and JDs
+# =============================
+def synthetic_jds(n, seed=0):
+    # A short brief plus a dozen skills from one category
+    rng = random.Random(seed)
+    jds = []
+    for i in range(n):
+        category = rng.choice(list(category_skills))
+        skills = rng.sample(category_skills[category], min(12, len(category_skills[category])))
+        jds.append(f"We are hiring for the {category} team (requisition {i}).\n"
+                   f"Required skills: {', '.join(skills)}.\n"
+                   f"{' '.join(rng.choice(FILLER_WORDS) for _ in range(60))}")
+    return jds
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, text, lines_per_page=50):
+    # Minimal text-only PDF (Helvetica, one content stream per page), so the
+    # generator needs no PDF-writing dependency
+    lines = [_pdf_escape(line) for line in text.encode("latin-1", "replace").decode("latin-1").split("\n")]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in pages:
+        stream = ("BT /F1 10 Tf 14 TL 50 760 Td " + " ".join(f"({line}) Tj T*" for line in page) + " ET")
+        stream = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{k} 0 R" for k in kids).encode(), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_docx(path, text):
+    from docx import Document
+    doc = Document()
+    for line in text.split("\n"):
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+CORPUS_WRITERS = {"txt": None, "docx": write_docx, "pdf": write_pdf}
+
+
+def write_corpus(folder, n, formats=("txt", "docx", "pdf"), n_jds=5, seed=0):
+    # n resumes cycling through `formats`, plus n_jds JDs under folder/jds/
+    os.makedirs(os.path.join(folder, "jds"), exist_ok=True)
+    paths = []
+    for i, text in enumerate(raw_resume_texts(n, seed=seed)):
+        fmt = formats[i % len(formats)]
+        path = os.path.join(folder, f"resume_{i:05d}.{fmt}")
+        if CORPUS_WRITERS[fmt] is None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        else:
+            CORPUS_WRITERS[fmt](path, text)
+        paths.append(path)
+    jd_paths = []
+    for i, jd in enumerate(synthetic_jds(n_jds, seed=seed + 1)):
+        jd_paths.append(os.path.join(folder, "jds", f"jd_{i:02d}.txt"))
+        with open(jd_paths[-1], "w", encoding="utf-8") as f:
+            f.write(jd)
+    return paths, jd_paths
+
+
+# =============================
+# Suite: latency percentiles, throughput and peak memory per public function
+# =============================
+def _measure(func, calls, repeat):
+    # One untimed warm-up pass (model, extraction worker, OS file cache), then
+    # wall-clock latency of every call over `repeat` passes. best_ms, the
+    # lowest per-pass mean, is what regressions are judged on: it is the least
+    # sensitive to scheduler noise. Peak Python allocations come from one
+    # tracemalloc pass with PDF/DOCX parsed in-process, since tracemalloc
+    # cannot see the extraction child process.
+    import tracemalloc
+    import resume_ranker
+    for args in calls:
+        func(*args)
+    latencies, pass_means = [], []
+    for _ in range(repeat):
+        start = len(latencies)
+        for args in calls:
+            started = time.perf_counter()
+            func(*args)
+            latencies.append(time.perf_counter() - started)
+        pass_means.append(float(np.mean(latencies[start:])))
+    timeout, resume_ranker.EXTRACT_TIMEOUT = resume_ranker.EXTRACT_TIMEOUT, 0
+    tracemalloc.start()
+    try:
+        for args in calls:
+            func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        resume_ranker.EXTRACT_TIMEOUT = timeout
+    ms = np.array(latencies) * 1000
+    return {"calls": len(latencies), "best_ms": round(min(pass_means) * 1000, 3),
+            "p50_ms": round(float(np.percentile(ms, 50)), 3),
+            "p90_ms": round(float(np.percentile(ms, 90)), 3), "p99_ms": round(float(np.percentile(ms, 99)), 3),
+            "mean_ms": round(float(ms.mean()), 3), "per_sec": round(len(ms) / (ms.sum() / 1000), 2) if ms.sum() else 0.0,
+            "peak_mb": round(peak / 2**20, 2)}
+
+
+def _suite_child(folder, repeat):
+    # One measurement run over an existing corpus, in a fresh interpreter
+    paths = list_resume_files(folder)
+    formats = sorted({p.rsplit(".", 1)[-1] for p in paths})
+    jds = []
+    for name in sorted(os.listdir(os.path.join(folder, "jds"))):
+        with open(os.path.join(folder, "jds", name), encoding="utf-8") as f:
+            jds.append(f.read())
+    jd_skills = [extract_skills_from_text(clean_text(jd)) for jd in jds]
+    raw_texts = [extract_text_from_file(p) for p in paths]
+    cleaned = [clean_text(t) for t in raw_texts]
+    records = process_resumes(paths, jd_skills[0])
+
+    results = {}
+    # Per-document functions: one sample per document
+    results["extract_text_from_file"] = _measure(extract_text_from_file, [(p,) for p in paths], repeat)
+    for fmt in formats:
+        results[f"extract_text_from_file[{fmt}]"] = _measure(
+            extract_text_from_file, [(p,) for p in paths if p.endswith("." + fmt)], repeat)
+    results["clean_text"] = _measure(clean_text, [(t,) for t in raw_texts], repeat)
+    results["extract_skills_from_text"] = _measure(extract_skills_from_text, [(t,) for t in cleaned], repeat)
+    # Batch functions: one sample per call over the whole corpus
+    results["process_resumes"] = _measure(process_resumes, [(paths, jd_skills[0])], repeat)
+    results["rank_resumes"] = _measure(rank_resumes, [(records, jd, s) for jd, s in zip(jds, jd_skills)], repeat)
+    results["rank_uploaded_resumes"] = _measure(rank_uploaded_resumes, [(paths, jd) for jd in jds], repeat)
+    for name in ("process_resumes", "rank_resumes", "rank_uploaded_resumes"):
+        calls_per_sec = results[name]["per_sec"]
+        results[name]["resumes_per_sec"] = round(calls_per_sec * len(paths), 1)
+    print(json.dumps(results))
+
+
+def _combine_runs(runs):
+    # Several processes' results: best of the best latencies, median of the
+    # rest, largest peak memory
+    results = {}
+    for name in runs[0]:
+        samples = [run[name] for run in runs]
+        combined = {key: round(float(np.median([s[key] for s in samples])), 3) for key in samples[0]}
+        combined["calls"] = sum(s["calls"] for s in samples)
+        combined["best_ms"] = min(s["best_ms"] for s in samples)
+        combined["peak_mb"] = max(s["peak_mb"] for s in samples)
+        results[name] = combined
+    return results
+
+
+def bench_suite(n_resumes=60, formats=("txt", "docx", "pdf"), n_jds=3, repeat=5, processes=3, folder=None, seed=0):
+    tmp = None
+    if folder is None:
+        folder = tmp = tempfile.mkdtemp(prefix="bench_corpus_")
+    try:
+        write_corpus(folder, n_resumes, formats, n_jds, seed)
+        runs = []
+        for _ in range(processes):
+            out = subprocess.run([sys.executable, __file__, "_suite_child", folder, "--repeat", str(repeat)],
+                                 check=True, capture_output=True, text=True).stdout
+            runs.append(json.loads(out.strip().splitlines()[-1]))
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    import platform
+    return {"meta": {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                     "platform": platform.platform(), "cpus": os.cpu_count(), "resumes": n_resumes,
+                     "formats": list(formats), "jds": n_jds, "repeat": repeat, "processes": processes,
+                     "seed": seed},
+            "results": _combine_runs(runs)}
+
+
+# Peak memory below this is too small to judge by ratio
+MIN_GATED_PEAK_MB = 0.5
+
+def compare_runs(baseline, current, threshold=0.15):
+    # Rows of current vs baseline; a function regresses when its best latency
+    # (p50 for baselines from older runs) or peak memory grows by more than
+    # `threshold`
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        key = "best_ms" if "best_ms" in base else "p50_ms"
+        latency = cur[key] / base[key] if base[key] else 1.0
+        memory = cur["peak_mb"] / base["peak_mb"] if base["peak_mb"] else 1.0
+        if max(cur["peak_mb"], base["peak_mb"]) < MIN_GATED_PEAK_MB:
+            memory = 1.0
+        rows.append({"function": name, "base_ms": base[key], "ms": cur[key],
+                     "ms_ratio": round(latency, 2), "base_peak_mb": base["peak_mb"], "peak_mb": cur["peak_mb"],
+                     "peak_ratio": round(memory, 2),
+                     "status": "REGRESSION" if max(latency, memory) > 1 + threshold else "ok"})
+    return rows
+
+
+def print_table(rows):
+    if not rows:
+        return
+    cols = list(rows[0].keys())
+    print("  ".join(f"{c:>14}" for c in cols))
+    for row in rows:
+        print("  ".join(f"{row[c]!s:>14}" for c in cols))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resume pipeline benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p_workers = sub.add_parser("workers", help="extraction throughput vs worker count")
+    p_workers.add_argument("folder")
+    p_workers.add_argument("--jd", required=True, help="path to a job description text file")
+    p_workers.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    p_workers.add_argument("--repeat", type=int, default=1)
+
+    p_index = sub.add_parser("index", help="per-JD latency: persistent index vs refit")
+    p_index.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    p_index.add_argument("--queries", type=int, default=20)
+    p_index.add_argument("--k", type=int, default=50)
+
+    p_spacy = sub.add_parser("spacy", help="skill extraction latency/RSS: full pipeline vs fast mode")
+    p_spacy.add_argument("--docs", type=int, default=500)
+
+    p_startup = sub.add_parser("startup", help="import time, model load and per-worker private RSS")
+    p_startup.add_argument("--workers", type=int, default=4)
+
+    p_clean = sub.add_parser("clean", help="clean_text/contact extraction: golden check and timing")
+    p_clean.add_argument("--docs", type=int, default=2000)
+    p_clean.add_argument("--folder", help="also check real resumes from this folder")
+    p_clean.add_argument("--repeat", type=int, default=3)
+
+    p_jds = sub.add_parser("jds", help="ranking against several JDs: per-JD loop vs matrix scoring")
+    p_jds.add_argument("--resumes", type=int, default=5000)
+    p_jds.add_argument("--jds", type=int, default=20)
+    p_jds.add_argument("--k", type=int, default=50)
+
+    p_pool = sub.add_parser("pool", help="candidate pool: hot add/withdraw latency vs full re-rank")
+    p_pool.add_argument("--resumes", type=int, default=5000)
+    p_pool.add_argument("--updates", type=int, default=200)
+
+    p_memory = sub.add_parser("memory", help="peak RSS of a ranking run: full vs streaming mode")
+    p_memory.add_argument("--resumes", type=int, default=5000)
+    p_memory.add_argument("--folder", help="corpus from `generate` (needs a jds/ subfolder)")
+    p_memory.add_argument("--workers", type=int, default=1)
+
+    p_generate = sub.add_parser("generate", help="write a synthetic txt/docx/pdf resume corpus and JDs")
+    p_generate.add_argument("folder")
+    p_generate.add_argument("--resumes", type=int, default=1000)
+    p_generate.add_argument("--formats", nargs="+", choices=sorted(CORPUS_WRITERS), default=["txt", "docx", "pdf"])
+    p_generate.add_argument("--jds", type=int, default=5)
+    p_generate.add_argument("--seed", type=int, default=0)
+
+    p_suite = sub.add_parser("suite", help="latency percentiles, throughput and peak memory of the public API")
+    p_suite.add_argument("--resumes", type=int, default=60)
+    p_suite.add_argument("--formats", nargs="+", choices=sorted(CORPUS_WRITERS), default=["txt", "docx", "pdf"])
+    p_suite.add_argument("--jds", type=int, default=3)
+    p_suite.add_argument("--repeat", type=int, default=5, help="timed passes per process, after one warm-up")
+    p_suite.add_argument("--processes", type=int, default=3, help="fresh interpreters to measure in")
+    p_suite.add_argument("--seed", type=int, default=0)
+    p_suite.add_argument("--out", help="write the results as JSON")
+    p_suite.add_argument("--compare", help="baseline JSON from an earlier run; exit 1 on regressions")
+    p_suite.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown/growth (0.15 = 15%%)")
+
+    p_child = sub.add_parser("_spacy_child")
+    p_child.add_argument("mode", choices=["full", "fast"])
+    p_child.add_argument("corpus")
+
+    p_suite_child = sub.add_parser("_suite_child")
+    p_suite_child.add_argument("folder")
+    p_suite_child.add_argument("--repeat", type=int, default=5)
+
+    p_memory_child = sub.add_parser("_memory_child")
+    p_memory_child.add_argument("mode", choices=["full", "streaming"])
+    p_memory_child.add_argument("folder")
+    p_memory_child.add_argument("jd")
+    p_memory_child.add_argument("--workers", type=int, default=1)
+
+    args = parser.parse_args(argv)
+    if args.bench == "workers":
+        with open(args.jd, encoding="utf-8", errors="ignore") as f:
+            jd_text = f.read()
+        print_table(bench_workers(args.folder, jd_text, args.workers, args.repeat))
+    elif args.bench == "index":
+        print_table(bench_index(args.sizes, args.queries, args.k))
+    elif args.bench == "spacy":
+        print_table(bench_spacy(args.docs))
+    elif args.bench == "startup":
+        print_table(bench_startup(args.workers))
+    elif args.bench == "clean":
+        print_table(bench_clean(args.docs, args.folder, args.repeat))
+    elif args.bench == "jds":
+        print_table(bench_jds(args.resumes, args.jds, args.k))
+    elif args.bench == "pool":
+        print_table(bench_pool(args.resumes, args.updates))
+    elif args.bench == "memory":
+        print_table(bench_memory(args.resumes, args.folder, args.workers))
+    elif args.bench == "generate":
+        paths, jd_paths = write_corpus(args.folder, args.resumes, args.formats, args.jds, args.seed)
+        print(f"Wrote {len(paths)} resumes and {len(jd_paths)} JDs to {args.folder}")
+    elif args.bench == "suite":
+        run = bench_suite(args.resumes, args.formats, args.jds, args.repeat, args.processes, seed=args.seed)
+        print_table([{"function": name, **stats} for name, stats in run["results"].items()])
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(run, f, indent=2)
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                rows = compare_runs(json.load(f), run, args.threshold)
+            print()
+            print_table(rows)
+            if any(row["status"] != "ok" for row in rows):
+                raise SystemExit(1)
+    elif args.bench == "_spacy_child":
+        _spacy_child(args.mode, args.corpus)
+    elif args.bench == "_suite_child":
+        _suite_child(args.folder, args.repeat)
+    elif args.bench == "_memory_child":
+        _memory_child(args.mode, args.folder, args.jd, args.workers)
+
+
+if __name__ == '__main__':
+    main()
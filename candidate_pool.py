@@ -0,0 +1,241 @@
+# candidate_pool.py
+# Long-lived, incrementally updated ranking for one open requisition.
+#
+# A CandidatePool holds one JD and every resume received for it. Adding or
+# withdrawing a resume touches only that document: its term counts go into
+# (or out of) a ResumeIndex, which keeps document frequencies up to date,
+# and its score is computed from its own terms and the JD's terms alone,
+# then placed into a ranking kept sorted with bisect. Scores are computed as
+# rank_resumes(..., index=...) computes them: TF-IDF cosine +
+# SKILL_OVERLAP_WEIGHT x matching skills.
+#
+# Each new document also shifts the IDF of its terms, which slowly makes
+# older scores stale. The pool tracks how far the IDF of the JD's terms (and
+# the corpus size) has moved since the last full rescore and rescores
+# everything, with one sparse product, once that drift passes
+# rescore_tolerance. So the ranking equals rank_resumes' exactly only right
+# after a rescore; in between, older scores may be off by up to that drift.
+import bisect
+import json
+import os
+import shutil
+
+import numpy as np
+
+from resume_index import ResumeIndex
+from resume_ranker import (clean_text, extract_skills_from_text, parse_resume, build_resume_record, source_name,
+                           source_digest, get_skill_index, SKILL_OVERLAP_WEIGHT)
+
+DEFAULT_RESCORE_TOLERANCE = 0.05
+RECORD_FIELDS = ("file", "name", "email", "phone")
+
+
+class CandidatePool:
+    def __init__(self, jd_text, required_skills=None, rescore_tolerance=DEFAULT_RESCORE_TOLERANCE, index=None):
+        self.jd_text = jd_text
+        self.required_skills = list(required_skills or [])
+        self.rescore_tolerance = rescore_tolerance
+        self.index = index if index is not None else ResumeIndex()
+
+        skill_index = get_skill_index()
+        self.jd_skills = extract_skills_from_text(clean_text(jd_text))
+        self._jd_related = skill_index.related_mask(self.jd_skills)
+        self._jd_skill_ids = set(skill_index.to_ids(self.jd_skills))
+        self._required = skill_index.required_mask(self.required_skills)
+        self._jd_terms = self.index.analyze(clean_text(jd_text))
+
+        self.records = {}      # doc id -> {"file", "name", "email", "phone", "skill_ids", "seq"}
+        self._scores = {}      # doc id -> score, for ranked (eligible) documents
+        self._order = []       # sorted (-score, seq, doc id)
+        self._next_seq = 0
+        self._ref_n = 0        # corpus size at the last full rescore
+        self._ref_idf = {}     # JD term column -> idf at the last full rescore
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.records
+
+    # -------- updates --------
+    def add(self, source, cache=None):
+        # source: file path or (filename, bytes); returns the document id (content hash)
+        doc_id = source_digest(source)
+        parsed = cache.get(doc_id) if cache is not None else None
+        if parsed is None:
+            parsed = parse_resume(source)
+            if cache is not None:
+                cache.put(doc_id, parsed)
+        self.add_parsed(doc_id, os.path.basename(source_name(source)), parsed)
+        return doc_id
+
+    def add_parsed(self, doc_id, file_name, parsed):
+        # parsed: a parse_resume()/parse_sources() entry
+        if doc_id in self.records:
+            self.withdraw(doc_id)
+        record = build_resume_record(file_name, parsed, self.jd_skills, digest=doc_id, jd_related=self._jd_related)
+        self.index.add(doc_id, parsed["text"])
+        self.records[doc_id] = {"file": file_name, "name": record["name"], "email": record["email"],
+                                "phone": record["phone"], "skill_ids": record["skill_ids"], "seq": self._next_seq}
+        self._next_seq += 1
+        if record["skill_mask"] & self._required == self._required:
+            self._place(doc_id, self._score_one(doc_id))
+        self._maybe_rescore()
+
+    def withdraw(self, doc_id):
+        record = self.records.pop(doc_id, None)
+        if record is None:
+            return False
+        self._unplace(doc_id, record["seq"])
+        self.index.remove(doc_id)
+        self._maybe_rescore()
+        return True
+
+    # -------- scoring --------
+    def _jd_vector(self):
+        # Sorted columns and l2-normalised tf-idf weights of the JD's terms
+        # that currently occur in the corpus
+        cols, counts = [], []
+        for term, n in self._jd_terms.items():
+            col = self.index.vocabulary.get(term)
+            if col is not None:
+                cols.append(col)
+                counts.append(n)
+        cols = np.asarray(cols, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.float64)
+        live = self.index.df(cols) > 0
+        cols, counts = cols[live], counts[live]
+        order = np.argsort(cols)
+        cols, weights = cols[order], counts[order] * self.index.idf(cols[order])
+        norm = np.linalg.norm(weights)
+        return cols, weights / norm if norm else weights
+
+    def _overlap(self, doc_id):
+        return sum(1 for i in self.records[doc_id]["skill_ids"] if i in self._jd_skill_ids)
+
+    def _score_one(self, doc_id):
+        # O(document + JD terms): the document's own tf-idf row against the JD
+        cols, counts = self.index.terms(doc_id)
+        weights = np.asarray(counts, dtype=np.float64) * self.index.idf(cols)
+        norm = np.linalg.norm(weights)
+        jd_cols, jd_weights = self._jd_vector()
+        _, doc_pos, jd_pos = np.intersect1d(cols, jd_cols, assume_unique=True, return_indices=True)
+        similarity = float(weights[doc_pos] @ jd_weights[jd_pos]) / norm if norm else 0.0
+        return similarity + SKILL_OVERLAP_WEIGHT * self._overlap(doc_id)
+
+    def _place(self, doc_id, score):
+        entry = (-score, self.records[doc_id]["seq"], doc_id)
+        bisect.insort(self._order, entry)
+        self._scores[doc_id] = score
+
+    def _unplace(self, doc_id, seq):
+        score = self._scores.pop(doc_id, None)
+        if score is not None:
+            del self._order[bisect.bisect_left(self._order, (-score, seq))]
+
+    def drift(self):
+        # Largest relative change, since the last full rescore, of the corpus
+        # size or of the IDF of any JD term (inf if the JD's terms changed)
+        n = len(self.index)
+        if not self._ref_n:
+            return float("inf") if n else 0.0
+        cols, _ = self._jd_vector()
+        if set(cols.tolist()) != set(self._ref_idf):
+            return float("inf")
+        drift = abs(n - self._ref_n) / self._ref_n
+        if len(cols):
+            ref = np.array([self._ref_idf[c] for c in cols.tolist()])
+            drift = max(drift, float(np.max(np.abs(self.index.idf(cols) - ref) / ref)))
+        return drift
+
+    def _maybe_rescore(self):
+        if self.drift() > self.rescore_tolerance:
+            self.rescore()
+
+    def rescore(self):
+        # Every score recomputed with the current IDF, as one sparse mat-vec
+        doc_ids = list(self._scores)
+        self._order = []
+        self._scores = {}
+        if doc_ids:
+            similarities = self.index.scores(clean_text(self.jd_text), doc_ids)
+            for doc_id, similarity in zip(doc_ids, similarities):
+                self._scores[doc_id] = float(similarity) + SKILL_OVERLAP_WEIGHT * self._overlap(doc_id)
+            self._order = sorted((-score, self.records[d]["seq"], d) for d, score in self._scores.items())
+        cols, _ = self._jd_vector()
+        self._ref_n = len(self.index)
+        self._ref_idf = dict(zip(cols.tolist(), self.index.idf(cols).tolist()))
+
+    # -------- results --------
+    def ranking(self, k=None):
+        # Same row format as rank_resumes
+        skill_index = get_skill_index()
+        ranked_output = []
+        for rank, (neg_score, _, doc_id) in enumerate(self._order[:k], start=1):
+            r = self.records[doc_id]
+            ranked_output.append({
+                "rank": rank,
+                "id": doc_id,
+                "name": r["name"],
+                "email": r["email"],
+                "phone": r["phone"],
+                "basename": r["file"],
+                "score": round(-neg_score, 3),
+                "skills": skill_index.names(r["skill_ids"]) or ["No relevant skills"]
+            })
+        return ranked_output
+
+    # -------- persistence --------
+    # path/index/          ResumeIndex (memory-mapped on load)
+    # path/records.json    columnar contact fields, doc ids and insertion order
+    # path/skill_ids.npy   all records' relevant skill ids, concatenated
+    # path/skill_ptr.npy   offsets into skill_ids per record
+    # path/scores.npy      current score per record (nan = filtered out)
+    # path/meta.json       JD, settings, rescore reference
+    def save(self, path):
+        tmp = path.rstrip(os.sep) + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        doc_ids = list(self.records)
+        records = [self.records[d] for d in doc_ids]
+        self.index.save(os.path.join(tmp, "index"))
+        with open(os.path.join(tmp, "records.json"), "w", encoding="utf-8") as f:
+            json.dump({"doc_ids": doc_ids, "seq": [r["seq"] for r in records],
+                       **{field: [r[field] for r in records] for field in RECORD_FIELDS}}, f)
+        np.save(os.path.join(tmp, "skill_ids.npy"),
+                np.fromiter((i for r in records for i in r["skill_ids"]), dtype=np.int32))
+        np.save(os.path.join(tmp, "skill_ptr.npy"), np.cumsum([0] + [len(r["skill_ids"]) for r in records]))
+        np.save(os.path.join(tmp, "scores.npy"), np.array([self._scores.get(d, np.nan) for d in doc_ids]))
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"jd_text": self.jd_text, "required_skills": self.required_skills,
+                       "rescore_tolerance": self.rescore_tolerance, "next_seq": self._next_seq,
+                       "ref_n": self._ref_n, "ref_idf": [[c, v] for c, v in self._ref_idf.items()]}, f)
+        # Swap in the new copy; the old one is only deleted once the new one is in place
+        old = path.rstrip(os.sep) + ".old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(path):
+            os.rename(path, old)
+        os.rename(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        pool = cls(meta["jd_text"], meta["required_skills"], meta["rescore_tolerance"],
+                   index=ResumeIndex.load(os.path.join(path, "index"), mmap=mmap))
+        with open(os.path.join(path, "records.json"), encoding="utf-8") as f:
+            columns = json.load(f)
+        skill_ids = np.load(os.path.join(path, "skill_ids.npy")).tolist()
+        skill_ptr = np.load(os.path.join(path, "skill_ptr.npy")).tolist()
+        scores = np.load(os.path.join(path, "scores.npy"))
+        for i, doc_id in enumerate(columns["doc_ids"]):
+            pool.records[doc_id] = {**{field: columns[field][i] for field in RECORD_FIELDS},
+                                    "skill_ids": skill_ids[skill_ptr[i]:skill_ptr[i + 1]], "seq": columns["seq"][i]}
+        ranked = np.flatnonzero(~np.isnan(scores))
+        pool._scores = {columns["doc_ids"][i]: float(scores[i]) for i in ranked}
+        pool._order = sorted((-score, pool.records[d]["seq"], d) for d, score in pool._scores.items())
+        pool._next_seq = meta["next_seq"]
+        pool._ref_n = meta["ref_n"]
+        pool._ref_idf = {c: v for c, v in meta["ref_idf"]}
+        return pool
@@ -0,0 +1,16 @@
+# gunicorn.conf.py
+#   gunicorn -c gunicorn.conf.py app:app
+#
+# preload_app imports app.py once in the master (loading the spaCy model,
+# skill matcher and skill index via RANKER_PRELOAD) before the workers are
+# forked, so they share those pages copy-on-write instead of each building
+# its own copy. Background job threads start lazily inside each worker.
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+timeout = 120
+preload_app = True
+
+os.environ.setdefault("RANKER_PRELOAD", "1")
@@ -0,0 +1,38 @@
+// job.js — poll a ranking job until its results are ready
+document.addEventListener('DOMContentLoaded', () => {
+  const card = document.getElementById('jobCard');
+  const bar = document.getElementById('progressBar');
+  const text = document.getElementById('progressText');
+  const statusUrl = card.dataset.statusUrl;
+  const resultsUrl = card.dataset.resultsUrl;
+
+  function render(job) {
+    if (job.status === 'queued') {
+      text.textContent = 'Waiting in queue';
+      return;
+    }
+    const pct = job.total ? Math.round(100 * job.done / job.total) : 0;
+    bar.style.width = pct + '%';
+    if (job.stage === 'ranking') {
+      text.textContent = `Scoring ${job.total} resumes against the job description`;
+    } else {
+      text.textContent = `Parsed ${job.done} / ${job.total} resumes`;
+    }
+  }
+
+  function poll() {
+    fetch(statusUrl, { headers: { 'Accept': 'application/json' } })
+      .then(r => r.json())
+      .then(job => {
+        if (job.status === 'done' || job.status === 'failed' || job.error) {
+          window.location = resultsUrl;
+          return;
+        }
+        render(job);
+        setTimeout(poll, 1000);
+      })
+      .catch(() => setTimeout(poll, 3000));
+  }
+
+  poll();
+});
@@ -0,0 +1,198 @@
+# jobs.py
+# Background ranking jobs.
+#
+# /upload hands the batch to a JobManager and returns immediately. Jobs run
+# on a small pool of threads fed by a bounded queue; their status, progress
+# and results are kept in SQLite so any gunicorn worker process can answer
+# a /jobs/<id> poll, not just the one that accepted the upload.
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class QueueFull(Exception):
+    pass
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       TEXT PRIMARY KEY,
+    status   TEXT NOT NULL,            -- queued | running | done | failed
+    created  REAL NOT NULL,
+    started  REAL,
+    finished REAL,
+    stage    TEXT,
+    done     INTEGER NOT NULL DEFAULT 0,
+    total    INTEGER NOT NULL DEFAULT 0,
+    stages   TEXT NOT NULL DEFAULT '{}',   -- stage -> seconds
+    meta     TEXT NOT NULL DEFAULT '{}',
+    result   TEXT,
+    error    TEXT
+)
+"""
+
+
+def new_job_id():
+    return uuid.uuid4().hex
+
+
+def is_job_id(value):
+    # Job ids end up in file paths, so anything else is rejected outright
+    return bool(re.fullmatch(r'[0-9a-f]{32}', value or ''))
+
+
+class JobStore:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(SCHEMA)
+
+    def _connect(self):
+        # One short-lived connection per call: sqlite3 connections can't be
+        # shared across threads, and WAL keeps concurrent readers cheap
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def create(self, job_id, meta=None):
+        with self._connect() as conn:
+            conn.execute("INSERT INTO jobs (id, status, created, meta) VALUES (?, 'queued', ?, ?)",
+                         (job_id, time.time(), json.dumps(meta or {})))
+
+    def update(self, job_id, **fields):
+        for key in ("stages", "meta", "result"):
+            if key in fields:
+                fields[key] = json.dumps(fields[key])
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {cols} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id, with_result=False):
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["stages"] = json.loads(job["stages"])
+        job["meta"] = json.loads(job["meta"])
+        result = job.pop("result")
+        if with_result:
+            job["result"] = json.loads(result) if result else None
+        return job
+
+    def fail_unfinished_before(self, cutoff, error):
+        # Jobs whose process died (worker restart, crash) stay queued/running
+        # in the table forever; anything created before cutoff is given up on
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET status = 'failed', finished = ?, error = ? "
+                         "WHERE status IN ('queued', 'running') AND created < ?", (time.time(), error, cutoff))
+
+    def delete_finished_before(self, cutoff):
+        with self._connect() as conn:
+            ids = [r[0] for r in conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('done', 'failed') AND finished < ?", (cutoff,))]
+            conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished < ?", (cutoff,))
+        return ids
+
+
+class JobProgress:
+    # on_progress(stage, done, total) callback that also records how long
+    # each stage took. Writes are throttled so tiny chunks don't hammer SQLite.
+    def __init__(self, store, job_id, min_interval=0.25):
+        self.store = store
+        self.job_id = job_id
+        self.min_interval = min_interval
+        self.stages = {}
+        self.stage = None
+        self.stage_started = None
+        self._last_write = 0.0
+
+    def __call__(self, stage, done, total):
+        now = time.time()
+        changed = stage != self.stage
+        if changed:
+            self._close_stage(now)
+            self.stage, self.stage_started = stage, now
+        if changed or done >= total or now - self._last_write >= self.min_interval:
+            self.store.update(self.job_id, stage=stage, done=done, total=total, stages=self.stages)
+            self._last_write = now
+
+    def _close_stage(self, now):
+        if self.stage is not None:
+            self.stages[self.stage] = round(now - self.stage_started, 3)
+
+    def finish(self):
+        self._close_stage(time.time())
+        self.stage = None
+        return self.stages
+
+
+class JobManager:
+    def __init__(self, store, run, threads=2, max_queued=32, keep_seconds=24 * 3600, timeout_seconds=3600,
+                 on_evict=None):
+        # run(job_id, progress, **params) -> JSON-serialisable result
+        self.store = store
+        self.run = run
+        self.keep_seconds = keep_seconds
+        self.timeout_seconds = timeout_seconds
+        self.on_evict = on_evict
+        self.threads = threads
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._started_pid = None
+
+    def _ensure_started(self):
+        # Threads are started on first use, not in __init__: with gunicorn's
+        # preload_app the manager is created in the master, and threads don't
+        # survive the fork into the workers. Each process starts its own.
+        if self._started_pid == os.getpid():
+            return
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            if self._started_pid is not None:
+                # Forked child: the inherited queue/lock may be mid-use by a dead thread
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            for i in range(self.threads):
+                threading.Thread(target=self._worker, name=f"ranking-job-{i}", daemon=True).start()
+            self._started_pid = os.getpid()
+
+    def submit(self, job_id, meta=None, **params):
+        self._ensure_started()
+        self.prune()
+        self.store.create(job_id, meta)
+        try:
+            self._queue.put_nowait((job_id, params))
+        except queue.Full:
+            self.store.update(job_id, status="failed", finished=time.time(), error="job queue is full")
+            raise QueueFull(f"{self._queue.maxsize} jobs already waiting")
+        return job_id
+
+    def _worker(self):
+        while True:
+            job_id, params = self._queue.get()
+            progress = JobProgress(self.store, job_id)
+            self.store.update(job_id, status="running", started=time.time())
+            try:
+                result = self.run(job_id, progress, **params)
+                self.store.update(job_id, status="done", finished=time.time(), stage=None,
+                                  stages=progress.finish(), result=result)
+            except Exception as e:
+                self.store.update(job_id, status="failed", finished=time.time(),
+                                  stages=progress.finish(), error=str(e) or type(e).__name__)
+            finally:
+                self._queue.task_done()
+
+    def prune(self):
+        # Lost jobs are marked failed first, so their folders go with the
+        # other failed jobs once keep_seconds have passed
+        self.store.fail_unfinished_before(time.time() - self.timeout_seconds,
+                                          f"job did not finish within {self.timeout_seconds} s (worker restarted?)")
+        for job_id in self.store.delete_finished_before(time.time() - self.keep_seconds):
+            if self.on_evict:
+                self.on_evict(job_id)
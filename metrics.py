@@ -0,0 +1,124 @@
+# metrics.py
+# Per-stage timing for the ranking pipeline.
+#
+# A StageTimer collects wall-clock seconds per stage (file read, parse,
+# clean_text, spaCy matching, contact extraction, TF-IDF fit, similarity,
+# sort, ...) for one request, split by file type, plus per-file totals so
+# the slowest inputs can be reported. Timers from worker processes are
+# shipped back as plain dicts and merged. Finished timers are folded into
+# the process-wide METRICS registry served by /metrics.
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = defaultdict(float)                          # stage -> seconds
+        self.counts = defaultdict(int)                            # stage -> calls
+        self.by_type = defaultdict(lambda: defaultdict(float))    # file type -> stage -> seconds
+        self.files = defaultdict(float)                           # file name -> seconds
+        self.file_types = {}
+
+    def add(self, stage, seconds, file_name=None, file_type=None):
+        self.stages[stage] += seconds
+        self.counts[stage] += 1
+        if file_type:
+            self.by_type[file_type][stage] += seconds
+        if file_name:
+            self.files[file_name] += seconds
+            if file_type:
+                self.file_types[file_name] = file_type
+
+    @contextmanager
+    def stage(self, stage, file_name=None, file_type=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, file_name, file_type)
+
+    def to_raw(self):
+        # Picklable form for sending back from worker processes
+        return {"stages": dict(self.stages), "counts": dict(self.counts),
+                "by_type": {t: dict(s) for t, s in self.by_type.items()},
+                "files": dict(self.files), "file_types": dict(self.file_types)}
+
+    def merge(self, raw):
+        for stage, seconds in raw["stages"].items():
+            self.stages[stage] += seconds
+        for stage, n in raw["counts"].items():
+            self.counts[stage] += n
+        for file_type, stages in raw["by_type"].items():
+            for stage, seconds in stages.items():
+                self.by_type[file_type][stage] += seconds
+        for name, seconds in raw["files"].items():
+            self.files[name] += seconds
+        self.file_types.update(raw["file_types"])
+
+    def slowest_files(self, n=10):
+        top = sorted(self.files.items(), key=lambda kv: kv[1], reverse=True)[:n]
+        return [{"file": name, "type": self.file_types.get(name), "seconds": round(sec, 4)}
+                for name, sec in top]
+
+    def to_dict(self, slowest=10):
+        return {
+            "stages": {k: round(v, 4) for k, v in self.stages.items()},
+            "calls": dict(self.counts),
+            "by_file_type": {t: {k: round(v, 4) for k, v in s.items()} for t, s in self.by_type.items()},
+            "files": len(self.files),
+            "slowest_files": self.slowest_files(slowest),
+        }
+
+
+class MetricsRegistry:
+    # Process-wide aggregate (each gunicorn worker reports its own numbers)
+    def __init__(self, recent=50, slowest=20):
+        self._lock = threading.Lock()
+        self._total = StageTimer()
+        self._requests = 0
+        self._recent = deque(maxlen=recent)
+        self._slowest = slowest
+        self._slowest_files = []   # per (request, file), never summed across requests
+        self._started = time.time()
+
+    def record(self, request_id, timer, wall_seconds=None, **extra):
+        with self._lock:
+            self._requests += 1
+            # Files are only comparable within a request: "resume.pdf" from
+            # five jobs is five files, not one slow one
+            raw = timer.to_raw()
+            raw["files"], raw["file_types"] = {}, {}
+            self._total.merge(raw)
+            self._slowest_files = sorted(
+                self._slowest_files + [{"job": request_id, **f} for f in timer.slowest_files(self._slowest)],
+                key=lambda f: f["seconds"], reverse=True)[:self._slowest]
+            entry = {"id": request_id, "finished": time.time(), **timer.to_dict(), **extra}
+            if wall_seconds is not None:
+                entry["wall_seconds"] = round(wall_seconds, 4)
+            self._recent.append(entry)
+
+    def get(self, request_id):
+        with self._lock:
+            for entry in self._recent:
+                if entry["id"] == request_id:
+                    return entry
+        return None
+
+    def snapshot(self):
+        with self._lock:
+            totals = self._total.to_dict()
+            totals.pop("files")  # never collected across requests
+            totals["slowest_files"] = list(self._slowest_files)
+            return {
+                "pid": os.getpid(),
+                "uptime_seconds": round(time.time() - self._started, 1),
+                "requests": self._requests,
+                "totals": totals,
+                "recent": list(self._recent),
+            }
+
+
+METRICS = MetricsRegistry()
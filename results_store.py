@@ -0,0 +1,106 @@
+# results_store.py
+# Persisted ranking results, stored column by column.
+#
+# Each result set (one per ranking job) is a folder with one JSON-lines file
+# per column plus a small meta.json. Exports read the column files in
+# lockstep, chunk by chunk, so a CSV/XLSX download never needs the whole
+# table in memory and never re-runs the ranking.
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+
+COLUMNS = ["rank", "name", "email", "phone", "basename", "score", "skills"]
+HEADERS = {"rank": "Rank", "name": "Name", "email": "Email", "phone": "Phone", "basename": "File",
+           "score": "Score", "skills": "Skills Matched"}
+CHUNK_ROWS = 1000
+
+
+def _cell(column, value):
+    # Lists (skills) are stored flattened, the way they are exported
+    return "; ".join(value) if column == "skills" else value
+
+
+class ResultStore:
+    def __init__(self, folder_for):
+        # folder_for(result_id) -> directory for that result set
+        self.folder_for = folder_for
+
+    def _path(self, result_id, name):
+        return os.path.join(self.folder_for(result_id), name)
+
+    def save(self, result_id, ranked):
+        # Written under a temporary name and renamed, so readers never see half a result set
+        folder = self.folder_for(result_id)
+        os.makedirs(os.path.dirname(folder) or ".", exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=os.path.dirname(folder) or ".", prefix=".results-")
+        try:
+            files = {c: open(os.path.join(tmp, f"{c}.jsonl"), "w", encoding="utf-8") for c in COLUMNS}
+            try:
+                for row in ranked:
+                    for c in COLUMNS:
+                        files[c].write(json.dumps(_cell(c, row.get(c))) + "\n")
+            finally:
+                for f in files.values():
+                    f.close()
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"columns": COLUMNS, "rows": len(ranked), "created": time.time()}, f)
+            shutil.rmtree(folder, ignore_errors=True)
+            os.rename(tmp, folder)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def exists(self, result_id):
+        return os.path.exists(self._path(result_id, "meta.json"))
+
+    def meta(self, result_id):
+        with open(self._path(result_id, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def iter_chunks(self, result_id, columns=COLUMNS, chunk_rows=CHUNK_ROWS):
+        # Yields lists of row tuples (in `columns` order), chunk_rows at a time
+        files = [open(self._path(result_id, f"{c}.jsonl"), encoding="utf-8") for c in columns]
+        try:
+            chunk = []
+            for lines in zip(*files):
+                chunk.append(tuple(json.loads(line) for line in lines))
+                if len(chunk) == chunk_rows:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+        finally:
+            for f in files:
+                f.close()
+
+    def delete(self, result_id):
+        shutil.rmtree(self.folder_for(result_id), ignore_errors=True)
+
+    # -------- exports --------
+    def iter_csv(self, result_id, chunk_rows=CHUNK_ROWS):
+        # CSV text, one chunk of rows per yielded string (for streaming responses)
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow([HEADERS[c] for c in COLUMNS])
+        for chunk in self.iter_chunks(result_id, chunk_rows=chunk_rows):
+            writer.writerows(chunk)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue()
+
+    def write_xlsx(self, result_id, fileobj, chunk_rows=CHUNK_ROWS):
+        # write_only mode streams rows out instead of building the sheet in memory
+        from openpyxl import Workbook
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Ranking")
+        ws.append([HEADERS[c] for c in COLUMNS])
+        for chunk in self.iter_chunks(result_id, chunk_rows=chunk_rows):
+            for row in chunk:
+                ws.append(list(row))
+        wb.save(fileobj)
@@ -0,0 +1,256 @@
+# resume_index.py
+# Persistent TF-IDF index over a resume corpus.
+#
+# rank_resumes refits a TfidfVectorizer over JD + corpus for every query.
+# ResumeIndex instead keeps raw term counts and document frequencies, so the
+# vocabulary/IDF is maintained incrementally as documents are added or
+# removed, and a new JD costs one transform plus one sparse matrix-vector
+# product. Scores match TfidfVectorizer(stop_words='english') defaults (raw
+# tf, smooth idf, l2 norm), except that the JD itself does not contribute
+# to the IDF statistics.
+import itertools
+import json
+import os
+from collections import Counter
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+class ResumeIndex:
+    def __init__(self, stop_words='english'):
+        self.stop_words = stop_words
+        self._analyzer = TfidfVectorizer(stop_words=stop_words).build_analyzer()
+        self.vocabulary = {}          # term -> column
+        self.doc_ids = []             # row -> document id
+        self._row_of = {}             # document id -> row
+        self._alive = []              # row -> still in the index?
+        self._df = np.zeros(0, dtype=np.int64)
+        self._counts = sp.csr_matrix((0, 0), dtype=np.float64)  # consolidated rows
+        self._pending = []            # rows added since the last consolidation
+        self._tfidf = None            # cached normalised tf-idf matrix
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._row_of
+
+    # -------- add / remove --------
+    def analyze(self, text):
+        # term -> count, with the same tokenisation/stop words as the index
+        return Counter(self._analyzer(text))
+
+    def _term_counts(self, text, grow):
+        counts = self.analyze(text)
+        cols, values = [], []
+        for term, n in counts.items():
+            col = self.vocabulary.get(term)
+            if col is None:
+                if not grow:
+                    continue
+                col = self.vocabulary[term] = len(self.vocabulary)
+            cols.append(col)
+            values.append(n)
+        order = np.argsort(cols)
+        return np.asarray(cols, dtype=np.int32)[order], np.asarray(values, dtype=np.float64)[order]
+
+    def add(self, doc_id, text):
+        if doc_id in self._row_of:
+            self.remove(doc_id)
+        cols, values = self._term_counts(text, grow=True)
+        if len(self.vocabulary) > len(self._df):
+            self._df = np.concatenate([self._df, np.zeros(len(self.vocabulary) - len(self._df), dtype=np.int64)])
+        self._df[cols] += 1
+
+        self._row_of[doc_id] = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        self._alive.append(True)
+        self._pending.append((cols, values))
+        self._tfidf = None
+
+    def remove(self, doc_id):
+        row = self._row_of.pop(doc_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._df[self._row_terms(row)[0]] -= 1
+        self._tfidf = None
+        # Tombstoned rows are dropped once they make up a quarter of the matrix
+        if len(self._row_of) < 0.75 * len(self.doc_ids):
+            self.compact()
+        return True
+
+    def _row_terms(self, row):
+        # (columns, counts) of one row without consolidating pending rows
+        n_consolidated = self._counts.shape[0]
+        if row >= n_consolidated:
+            return self._pending[row - n_consolidated]
+        start, end = self._counts.indptr[row], self._counts.indptr[row + 1]
+        return self._counts.indices[start:end], self._counts.data[start:end]
+
+    def terms(self, doc_id):
+        # Sorted term columns and raw counts of one document, O(document)
+        return self._row_terms(self._row_of[doc_id])
+
+    def df(self, cols):
+        return self._df[cols]
+
+    def _consolidated(self):
+        n_terms = len(self.vocabulary)
+        counts = self._counts
+        if counts.shape[1] != n_terms:
+            counts = sp.csr_matrix((counts.data, counts.indices, counts.indptr),
+                                   shape=(counts.shape[0], n_terms))
+        if self._pending:
+            indptr = np.cumsum([0] + [len(cols) for cols, _ in self._pending])
+            new_rows = sp.csr_matrix((np.concatenate([v for _, v in self._pending]),
+                                      np.concatenate([c for c, _ in self._pending]),
+                                      indptr), shape=(len(self._pending), n_terms))
+            counts = sp.vstack([counts, new_rows], format="csr")
+            self._pending = []
+        self._counts = counts
+        return counts
+
+    def compact(self):
+        counts = self._consolidated()
+        keep = np.flatnonzero(self._alive)
+        self._counts = counts[keep]
+        self.doc_ids = [self.doc_ids[i] for i in keep]
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self.doc_ids)}
+        self._alive = [True] * len(self.doc_ids)
+        self._tfidf = None
+
+    # -------- scoring --------
+    def idf(self, cols=None):
+        # Smooth idf for every term, or only for the given columns
+        n = len(self._row_of)
+        df = self._df if cols is None else self._df[cols]
+        return np.log((1 + n) / (1 + df)) + 1
+
+    def _l2_normalize_rows(self, m):
+        norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sp.diags(1.0 / norms) @ m
+
+    def _matrix(self):
+        if self._tfidf is None:
+            counts = self._consolidated()
+            weighted = counts @ sp.diags(self.idf())
+            # Zero out removed documents so they can never score
+            weighted = sp.diags(np.asarray(self._alive, dtype=np.float64)) @ weighted
+            self._tfidf = self._l2_normalize_rows(weighted.tocsr()).tocsr()
+        return self._tfidf
+
+    def transform(self, text):
+        cols, values = self._term_counts(text, grow=False)
+        # Terms whose documents were all removed are out of the vocabulary
+        live = self._df[cols] > 0
+        cols, values = cols[live], values[live]
+        values = values * self.idf()[cols]
+        norm = np.linalg.norm(values)
+        if norm:
+            values /= norm
+        vec = np.zeros(len(self.vocabulary))
+        vec[cols] = values
+        return vec
+
+    def scores(self, jd_text, doc_ids=None):
+        sims = self._matrix() @ self.transform(jd_text)
+        if doc_ids is None:
+            return sims
+        return sims[[self._row_of[d] for d in doc_ids]]
+
+    def scores_many(self, jd_texts, doc_ids=None):
+        # (JDs x documents) similarities from a single sparse product
+        rows = [self.transform(t) for t in jd_texts]
+        jds = sp.csr_matrix(np.vstack(rows)) if rows else sp.csr_matrix((0, len(self.vocabulary)))
+        sims = (self._matrix() @ jds.T).T.toarray()
+        if doc_ids is None:
+            return sims
+        return sims[:, [self._row_of[d] for d in doc_ids]]
+
+    def query(self, jd_text, k=10):
+        sims = self.scores(jd_text)
+        alive = np.flatnonzero(self._alive)
+        if alive.size == 0:
+            return []
+        sims = sims[alive]
+        k = min(k, alive.size)
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind="stable")]
+        return [(self.doc_ids[alive[i]], float(sims[i])) for i in top]
+
+    # -------- persistence --------
+    def save(self, path):
+        self.compact()
+        os.makedirs(path, exist_ok=True)
+        counts = self._counts
+        # Plain .npy (not compressed .npz) so load() can memory-map the arrays
+        np.save(os.path.join(path, "data.npy"), counts.data)
+        np.save(os.path.join(path, "indices.npy"), counts.indices)
+        np.save(os.path.join(path, "indptr.npy"), counts.indptr)
+        np.save(os.path.join(path, "df.npy"), self._df)
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"stop_words": self.stop_words, "terms": terms, "doc_ids": self.doc_ids,
+                       "shape": list(counts.shape)}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(stop_words=meta["stop_words"])
+        mode = "r" if mmap else None
+        arrays = [np.load(os.path.join(path, name + ".npy"), mmap_mode=mode)
+                  for name in ("data", "indices", "indptr")]
+        index._counts = sp.csr_matrix(tuple(arrays), shape=tuple(meta["shape"]), copy=False)
+        index._df = np.array(np.load(os.path.join(path, "df.npy")))  # mutable copy
+        index.vocabulary = {term: col for col, term in enumerate(meta["terms"])}
+        index.doc_ids = meta["doc_ids"]
+        index._row_of = {doc_id: row for row, doc_id in enumerate(index.doc_ids)}
+        index._alive = [True] * len(index.doc_ids)
+        return index
+
+    # -------- incremental persistence --------
+    # save() rewrites the whole index. save_delta() writes only the given
+    # documents' rows and the terms added from column first_term on, so an
+    # index that grows in chunks can be checkpointed in O(chunk) per chunk;
+    # load_deltas() stacks the deltas back into one index.
+    def save_delta(self, path, doc_ids, first_term):
+        os.makedirs(path, exist_ok=True)
+        rows = [self.terms(doc_id) for doc_id in doc_ids]
+        np.save(os.path.join(path, "data.npy"), np.concatenate([v for _, v in rows] or [np.zeros(0)]))
+        np.save(os.path.join(path, "indices.npy"),
+                np.concatenate([c for c, _ in rows] or [np.zeros(0, dtype=np.int32)]).astype(np.int32))
+        np.save(os.path.join(path, "indptr.npy"), np.cumsum([0] + [len(c) for c, _ in rows]))
+        # Columns are handed out in insertion order and never reused, so the
+        # vocabulary's order is its column order
+        terms = list(itertools.islice(self.vocabulary, first_term, None))
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"stop_words": self.stop_words, "terms": terms, "doc_ids": list(doc_ids)}, f)
+
+    @classmethod
+    def load_deltas(cls, paths, stop_words='english'):
+        terms, doc_ids, blocks = [], [], []
+        for path in paths:
+            with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            stop_words = meta["stop_words"]
+            terms.extend(meta["terms"])
+            doc_ids.extend(meta["doc_ids"])
+            blocks.append([np.load(os.path.join(path, name + ".npy")) for name in ("data", "indices", "indptr")])
+        index = cls(stop_words=stop_words)
+        index.vocabulary = {term: col for col, term in enumerate(terms)}
+        counts = sp.vstack([sp.csr_matrix(tuple(b), shape=(len(b[2]) - 1, len(terms))) for b in blocks]
+                           + [sp.csr_matrix((0, len(terms)))], format="csr")
+        # A document added again in a later delta replaces its earlier row
+        last = {doc_id: row for row, doc_id in enumerate(doc_ids)}
+        keep = np.array(sorted(last.values()), dtype=np.int64)
+        index._counts = counts[keep]
+        index.doc_ids = [doc_ids[i] for i in keep]
+        index._row_of = {doc_id: row for row, doc_id in enumerate(index.doc_ids)}
+        index._alive = [True] * len(index.doc_ids)
+        index._df = np.bincount(index._counts.indices, minlength=len(terms)).astype(np.int64)
+        return index
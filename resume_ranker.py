@@ -1,64 +1,196 @@
 
 import os
 import re
-import pandas as pd
-from bs4 import BeautifulSoup
-import spacy
-from spacy.matcher import PhraseMatcher
+import time
+import hashlib
+import shutil
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 from tqdm import tqdm
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from docx import Document
-import PyPDF2
-from rapidfuzz import fuzz  # For fuzzy skill matching
+from resume_cache import file_digest, bytes_digest
+from text_extractors import (extract_text, file_extension, pdf_backend, EXTRACTORS, DEFAULT_MAX_PAGES,
+                             DEFAULT_MAX_CHARS)
+from metrics import StageTimer
+# spaCy, scikit-learn, scipy, BeautifulSoup and rapidfuzz are imported on
+# first use, so importing this module (app boot, CLI start) stays cheap.
 
 # =============================
 # 1️⃣ Allowed File Checker
 # =============================
 def allowed_file(filename):
-    allowed_extensions = {'pdf', 'doc', 'docx', 'txt'}
+    # No legacy .doc: there is no extractor for it, so it would be read as plain text
+    allowed_extensions = {'pdf', 'docx', 'txt', 'html', 'htm'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
 
 # =============================
 # 2️⃣ Load SpaCy model
 # =============================
-nlp = spacy.load("en_core_web_sm")
-stop_words = nlp.Defaults.stop_words
+SPACY_MODEL = "en_core_web_sm"
+
+# Skill matching only needs the tokenizer (PhraseMatcher with attr="LOWER"),
+# so by default the statistical components are not even loaded.
+# Set RESUME_NLP_FAST=0 to load the full pipeline.
+NLP_FAST = os.environ.get("RESUME_NLP_FAST", "1") != "0"
+NLP_HEAVY_COMPONENTS = ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer", "ner"]
+SPACY_BATCH_SIZE = 64
+
+# The model and skill matcher are built on first use (get_nlp / get_matcher)
+# and the trimmed pipeline + matcher patterns are serialized to
+# MODEL_CACHE_DIR, so later processes load them instead of rebuilding.
+# RESUME_MODEL_CACHE="" disables the on-disk copy.
+MODEL_CACHE_DIR = os.environ.get("RESUME_MODEL_CACHE", ".model_cache")
+
+_models = {}
+_models_lock = threading.Lock()
+
+def get_nlp():
+    if "nlp" not in _models:
+        _load_models()
+    return _models["nlp"]
+
+
+def get_matcher():
+    if "matcher" not in _models:
+        _load_models()
+    return _models["matcher"]
+
+
+def get_skill_index():
+    if "skill_index" not in _models:
+        with _models_lock:
+            if "skill_index" not in _models:
+                _models["skill_index"] = SkillIndex(all_known_skills)
+    return _models["skill_index"]
+
+
+def _model_cache_dir():
+    import spacy
+    from spacy.util import get_package_version
+    key = "|".join([spacy.__version__, SPACY_MODEL, str(get_package_version(SPACY_MODEL)),
+                    "fast" if NLP_FAST else "full", skills_fingerprint()])
+    return os.path.join(MODEL_CACHE_DIR, hashlib.sha1(key.encode("utf-8")).hexdigest()[:16])
+
+
+def _read_model_cache(path):
+    import spacy
+    from spacy.tokens import DocBin
+    nlp = spacy.load(os.path.join(path, "nlp"))
+    patterns = list(DocBin().from_disk(os.path.join(path, "patterns.spacy")).get_docs(nlp.vocab))
+    return nlp, patterns
+
+
+def _write_model_cache(path, nlp, patterns):
+    # Written next to the target and renamed, so readers never see half a cache
+    from spacy.tokens import DocBin
+    tmp = f"{path}.tmp-{os.getpid()}"
+    try:
+        os.makedirs(tmp, exist_ok=True)
+        nlp.to_disk(os.path.join(tmp, "nlp"))
+        DocBin(docs=patterns).to_disk(os.path.join(tmp, "patterns.spacy"))
+        os.rename(tmp, path)
+    except Exception as e:
+        if not os.path.isdir(path):  # otherwise another process just won the race
+            print(f"⚠ Could not write model cache {path}: {e}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _load_models():
+    with _models_lock:
+        if "matcher" in _models:
+            return
+        from spacy.matcher import PhraseMatcher
+        path = _model_cache_dir() if MODEL_CACHE_DIR else None
+        nlp = patterns = None
+        if path and os.path.isdir(path):
+            try:
+                nlp, patterns = _read_model_cache(path)
+            except Exception as e:
+                print(f"⚠ Ignoring unreadable model cache {path}: {e}")
+                nlp = patterns = None
+        if nlp is None:
+            import spacy
+            nlp = spacy.load(SPACY_MODEL, exclude=NLP_HEAVY_COMPONENTS) if NLP_FAST else spacy.load(SPACY_MODEL)
+            patterns = [nlp.make_doc(skill) for skill in all_known_skills]
+            if path:
+                _write_model_cache(path, nlp, patterns)
+        matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        matcher.add("SKILLS", patterns)
+        _models["nlp"] = nlp
+        _models["matcher"] = matcher
+
+
+def preload(freeze=True):
+    # Loads everything a ranking job needs up front. Under gunicorn's
+    # preload_app this runs in the master, so forked workers share the model
+    # pages copy-on-write instead of each building their own copy.
+    get_matcher()
+    get_skill_index()
+    import bs4  # noqa: F401
+    import sklearn.feature_extraction.text  # noqa: F401
+    import sklearn.metrics.pairwise  # noqa: F401
+    for extractor in set(EXTRACTORS.values()):
+        if extractor.preload:
+            extractor.preload()
+    if freeze:
+        # Move everything loaded so far out of the GC's reach: collections in
+        # the workers would otherwise touch (and un-share) those pages
+        import gc
+        gc.collect()
+        gc.freeze()
 
 
 # =============================
 # 3️⃣ Helper: Clean text
 # =============================
+# Only text that could contain a tag or an entity goes through BeautifulSoup
+# (html.parser leaves "<" not followed by a letter, "/", "!" or "?", and "&"
+# not followed by a letter or "#", untouched). PDF/DOCX text rarely does.
+MARKUP_HINT_RE = re.compile(r'<[a-zA-Z/!?]|&[#a-zA-Z]')
+# An email always matches from the start of its token, so the lookbehind
+# only lets the scan begin there instead of at every character.
+EMAIL_TOKEN_RE = re.compile(r'(?<!\S)\S*@\S*\s?')
+URL_RE = re.compile(r'http\S+|www\S+|https\S+')
+# [^a-z\s] -> ' ' followed by collapsing whitespace, in one pass
+NON_LETTERS_RE = re.compile(r'[^a-z]+')
+
 def clean_text(text):
     if not isinstance(text, str):
         return ""
-    text = BeautifulSoup(text, "html.parser").get_text()
+    if MARKUP_HINT_RE.search(text):
+        from bs4 import BeautifulSoup
+        text = BeautifulSoup(text, "html.parser").get_text()
     text = text.lower()
-    text = re.sub(r'\S*@\S*\s?', '', text)  # remove emails
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text)  # remove URLs
-    text = re.sub(r'[^a-z\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    if '@' in text:
+        text = EMAIL_TOKEN_RE.sub('', text)  # remove emails
+    if 'http' in text or 'www' in text:
+        text = URL_RE.sub('', text)  # remove URLs
+    return NON_LETTERS_RE.sub(' ', text).strip()
 
 
 # =============================
 # 4️⃣ Extract text from any file type
 # =============================
-def extract_text_from_file(file_path):
-    ext = file_path.split('.')[-1].lower()
+# Per-format streaming extractors live in text_extractors.py. Only the first
+# MAX_PAGES pages / MAX_CHARS characters are read, and PDF/DOCX parsing runs
+# in a reused child process that is killed (and replaced) when a file takes
+# longer than EXTRACT_TIMEOUT seconds (0 = no timeout).
+MAX_PAGES = int(os.environ.get("RESUME_MAX_PAGES", DEFAULT_MAX_PAGES))
+MAX_CHARS = int(os.environ.get("RESUME_MAX_CHARS", DEFAULT_MAX_CHARS))
+EXTRACT_TIMEOUT = float(os.environ.get("RESUME_EXTRACT_TIMEOUT", "30"))
+
+def extract_text_from_file(file_path, max_pages=None, max_chars=None, timeout=None, data=None):
+    # data: the file's bytes, if already in memory (file_path then only names the format)
     text = ""
     try:
-        if ext == "pdf":
-            with open(file_path, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                text = " ".join(page.extract_text() or "" for page in reader.pages)
-        elif ext == "docx":
-            doc = Document(file_path)
-            text = " ".join([p.text for p in doc.paragraphs])
-        else:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                text = f.read()
+        text = extract_text(file_path,
+                            max_pages=MAX_PAGES if max_pages is None else max_pages,
+                            max_chars=MAX_CHARS if max_chars is None else max_chars,
+                            timeout=EXTRACT_TIMEOUT if timeout is None else timeout,
+                            data=data)
     except Exception as e:
         print(f"⚠ Error reading {file_path}: {e}")
     return text
@@ -67,27 +199,37 @@ def extract_text_from_file(file_path):
 # =============================
 # 5️⃣ Extract Name, Email, Phone
 # =============================
+EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+PHONE_RE = re.compile(r'(\+?\d{1,3}[-\s]?)?\d{10}')
+
 def extract_contact_info(text):
     name = "Not Found"
     email = "Not Found"
     phone = "Not Found"
 
     # Email
-    email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', text)
+    email_match = EMAIL_RE.search(text)
     if email_match:
         email = email_match.group(0)
 
     # Phone
-    phone_match = re.search(r'(\+?\d{1,3}[-\s]?)?\d{10}', text)
+    phone_match = PHONE_RE.search(text)
     if phone_match:
         phone = phone_match.group(0)
 
-    # Name (heuristic)
-    lines = text.split('\n')
-    for line in lines:
-        if 2 <= len(line.split()) <= 4 and line.split()[0][0].isupper():
+    # Name (heuristic): the name is near the top, so lines are walked lazily
+    # instead of splitting the whole document, and each line is split once
+    start = 0
+    while start <= len(text):
+        end = text.find('\n', start)
+        if end == -1:
+            end = len(text)
+        line = text[start:end]
+        words = line.split()
+        if 2 <= len(words) <= 4 and words[0][0].isupper():
             name = line.strip()
             break
+        start = end + 1
 
     return name, email, phone
 
@@ -295,97 +437,786 @@ category_skills = {
 # =============================
 # 7️⃣ Build Matcher
 # =============================
+def skill_list(category_skills):
+    return sorted(set(skill.lower() for skills in category_skills.values() for skill in skills))
+
+
+def skills_fingerprint(skills=None):
+    return hashlib.sha1("\n".join(all_known_skills if skills is None else skills).encode("utf-8")).hexdigest()[:12]
+
+
 def build_skill_matcher(category_skills):
+    # For custom dictionaries; the default matcher comes from get_matcher()
+    from spacy.matcher import PhraseMatcher
+    nlp = get_nlp()
     matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-    all_skills = sorted(set(skill.lower() for skills in category_skills.values() for skill in skills))
+    all_skills = skill_list(category_skills)
     patterns = [nlp.make_doc(skill) for skill in all_skills]
     matcher.add("SKILLS", patterns)
     return matcher, all_skills
 
-matcher, all_known_skills = build_skill_matcher(category_skills)
+# Needs no model, so it is computed at import time
+all_known_skills = skill_list(category_skills)
+
+
+# =============================
+# 7️⃣b Skill Normalisation Index
+# =============================
+FUZZY_SKILL_THRESHOLD = 85
+
+def normalize_skill(skill):
+    # "Vue.js" -> "vue js", "B.Com" -> "b com"
+    return re.sub(r'[^a-z0-9+#]+', ' ', skill.lower()).strip()
+
+
+class SkillIndex:
+    # Integer ids for every known skill plus a one-time fuzzy similarity
+    # table, so JD filtering and overlap become bit operations instead of
+    # pairwise fuzz.ratio calls per resume. Skill sets are plain Python ints
+    # used as bit-vectors (bit i set = skill id i present).
+    def __init__(self, skills, threshold=FUZZY_SKILL_THRESHOLD):
+        self.skills = list(skills)
+        self.threshold = threshold
+        self.ids = {skill: i for i, skill in enumerate(self.skills)}
+
+        # Alias table: punctuation/case variants that map to exactly one skill
+        variants = {}
+        for i, skill in enumerate(self.skills):
+            variants.setdefault(normalize_skill(skill), set()).add(i)
+        self.aliases = {v: ids.pop() for v, ids in variants.items() if len(ids) == 1}
+        # Skills are matched on clean_text() output, which strips the
+        # punctuation/digits of e.g. "c++", "node.js", "b2b sales": those can never match
+        self.unmatchable_ids = {i for i, skill in enumerate(self.skills) if clean_text(skill) != skill.lower()}
+
+        # similar[i] = bit-vector of skills with fuzz.ratio > threshold vs skill i
+        from rapidfuzz import fuzz, process
+        scores = process.cdist(self.skills, self.skills, scorer=fuzz.ratio, workers=-1)
+        self.similar = [self.mask(np.flatnonzero(row > threshold)) for row in scores]
+
+    def to_id(self, skill):
+        skill_id = self.ids.get(skill)
+        if skill_id is None:
+            skill_id = self.aliases.get(normalize_skill(skill))
+        return skill_id
+
+    def to_ids(self, skills):
+        return [i for i in map(self.to_id, skills) if i is not None]
+
+    def names(self, skill_ids):
+        return [self.skills[i] for i in skill_ids]
+
+    @staticmethod
+    def mask(skill_ids):
+        bits = 0
+        for i in skill_ids:
+            bits |= 1 << int(i)
+        return bits
+
+    @staticmethod
+    def count(mask):
+        return bin(mask).count("1")
+
+    def incidence(self, id_lists):
+        # Binary (documents x skills) matrix for vectorised overlap counts
+        import scipy.sparse as sp
+        indptr = np.cumsum([0] + [len(ids) for ids in id_lists])
+        indices = np.fromiter((i for ids in id_lists for i in ids), dtype=np.int32, count=indptr[-1])
+        return sp.csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr),
+                             shape=(len(id_lists), len(self.skills)))
+
+    def vector(self, skill_ids):
+        vec = np.zeros(len(self.skills), dtype=np.float32)
+        vec[list(skill_ids)] = 1
+        return vec
+
+    def unmatchable(self, skills):
+        # Skills no resume can ever have: not in the dictionary, or unmatchable spellings
+        return [s for s in skills if self.to_id(s) is None or self.to_id(s) in self.unmatchable_ids]
+
+    def required_mask(self, skills):
+        # Must-have filter: a skill that can never be matched can never be
+        # met, so it sets a bit no resume has instead of being dropped
+        bits = self.mask(self.to_ids(skills))
+        if self.unmatchable(skills):
+            bits |= 1 << len(self.skills)
+        return bits
+
+    def related_mask(self, skills):
+        # Every known skill that fuzzy-matches at least one of `skills`
+        bits = 0
+        unknown = []
+        for skill in skills:
+            skill_id = self.to_id(skill)
+            if skill_id is None:
+                unknown.append(skill)
+            else:
+                bits |= self.similar[skill_id]
+        if unknown:
+            from rapidfuzz import fuzz, process
+            scores = process.cdist(unknown, self.skills, scorer=fuzz.ratio)
+            bits |= self.mask(np.flatnonzero((scores > self.threshold).any(axis=0)))
+        return bits
+
+
+# resume_ranker.nlp / .matcher / .stop_words / .skill_index keep working for
+# existing callers; they are simply built on first access now.
+_LAZY_ATTRS = {
+    "nlp": get_nlp,
+    "matcher": get_matcher,
+    "skill_index": get_skill_index,
+    "stop_words": lambda: get_nlp().Defaults.stop_words,
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        return _LAZY_ATTRS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # =============================
 # 8️⃣ Extract Skills
 # =============================
-def extract_skills_from_text(text, matcher):
-    doc = nlp(text.lower())
+def _matched_skills(doc, matcher):
     matches = matcher(doc)
     matched_skills = set(doc[start:end].text.lower().strip() for _, start, end in matches)
     return sorted(matched_skills)
 
 
+def skill_spans(text, skills):
+    # (start, end) of each occurrence of already-matched skills in the raw,
+    # uncleaned text (for highlighting). Matching ran on clean_text output,
+    # where any run of non-letters is one space, so words may be separated by
+    # any non-letters here.
+    alternatives = ["[^a-z]+".join(map(re.escape, skill.split())) for skill in skills if skill.split()]
+    if not alternatives:
+        return []
+    alternatives.sort(key=len, reverse=True)  # longest first: "machine learning" before "machine"
+    pattern = re.compile(r'(?<![a-z])(?:' + "|".join(alternatives) + r')(?![a-z])', re.IGNORECASE)
+    return [m.span() for m in pattern.finditer(text)]
+
+
+def extract_skills_from_text(text, matcher=None, fast=True):
+    # fast: tokenizer only -- the matcher never looks at tags/parses/entities
+    if matcher is None:
+        matcher = get_matcher()
+    nlp = get_nlp()
+    doc = nlp.make_doc(text.lower()) if fast else nlp(text.lower())
+    return _matched_skills(doc, matcher)
+
+
+def extract_skills_batch(texts, matcher=None, batch_size=SPACY_BATCH_SIZE, n_process=1):
+    # Same output as extract_skills_from_text for each text, but tokenised
+    # in batches through nlp.pipe with every pipeline component disabled
+    if matcher is None:
+        matcher = get_matcher()
+    nlp = get_nlp()
+    docs = nlp.pipe((t.lower() for t in texts), batch_size=batch_size,
+                    n_process=n_process, disable=nlp.pipe_names)
+    return [_matched_skills(doc, matcher) for doc in docs]
+
+
 # =============================
 # 9️⃣ Process Resumes (with JD filter)
 # =============================
-def process_resumes(folder_path, jd_skills):
-    resumes = []
-    files = [os.path.join(folder_path, f) for f in os.listdir(folder_path)
-             if f.lower().endswith(('pdf', 'docx', 'txt'))]
-
-    for file_path in tqdm(files, desc="📄 Processing resumes"):
-        raw_text = extract_text_from_file(file_path)
-        cleaned = clean_text(raw_text)
-        skills = extract_skills_from_text(cleaned, matcher)
-        name, email, phone = extract_contact_info(raw_text)
-
-        # Only keep JD-relevant skills (fuzzy matching)
-        relevant_skills = [s for s in skills if any(fuzz.ratio(s, j) > 85 for j in jd_skills)]
-
-        resumes.append({
-            "file": os.path.basename(file_path),
+RESUME_EXTENSIONS = ('pdf', 'docx', 'txt', 'html', 'htm')
+
+# Bump whenever extraction/cleaning/matching output changes so cached
+# parses from an older version are not reused. Extraction settings that
+# change the output (page/character budget, PDF backend) are part of the
+# namespace too.
+PARSER_VERSION = "2"
+
+def cache_namespace():
+    return (f"parser-v{PARSER_VERSION}-pages-{MAX_PAGES}-chars-{MAX_CHARS}-pdf-{pdf_backend()}"
+            f"-skills-{skills_fingerprint()}")
+
+
+# A resume "source" is either a file path or a (filename, bytes) pair for
+# files that are already in memory (e.g. archive members or upload buffers).
+def source_name(source):
+    return source[0] if isinstance(source, tuple) else source
+
+
+def source_digest(source):
+    return bytes_digest(source[1]) if isinstance(source, tuple) else file_digest(source)
+
+
+# Files up to this size are read into memory first, so "file_read" and
+# "parse" are timed separately; bigger ones are streamed by the extractor.
+PREREAD_MAX_BYTES = 16 * 1024 * 1024
+
+def read_source_bytes(source):
+    if isinstance(source, tuple):
+        return source[1]
+    try:
+        if os.path.getsize(source) > PREREAD_MAX_BYTES:
+            return None
+        with open(source, "rb") as f:
+            return f.read()
+    except OSError:
+        return None  # let the extractor report the error
+
+
+def parse_resumes(sources, batch_size=SPACY_BATCH_SIZE, timer=None):
+    # JD-independent part of the pipeline (this is what gets cached).
+    # Skill matching for the whole batch goes through one nlp.pipe call.
+    if timer is None:
+        timer = StageTimer()
+    sources = list(sources)
+    parsed = []
+    for source in sources:
+        path = source_name(source)
+        file_name, file_type = os.path.basename(path), file_extension(path)
+        with timer.stage("file_read", file_name, file_type):
+            data = read_source_bytes(source)
+        with timer.stage("parse", file_name, file_type):
+            raw_text = extract_text_from_file(path, data=data)
+        with timer.stage("clean_text", file_name, file_type):
+            cleaned = clean_text(raw_text)
+        with timer.stage("contact_info", file_name, file_type):
+            name, email, phone = extract_contact_info(raw_text)
+        parsed.append({
+            "raw_text": raw_text,
+            "text": cleaned,
+            "skills": None,
             "name": name,
             "email": email,
-            "phone": phone,
-            "text": cleaned,
-            "skills": relevant_skills or ["No relevant skills"]
+            "phone": phone
         })
-    return resumes
+
+    start = time.perf_counter()
+    skills = extract_skills_batch([p["text"] for p in parsed], batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    # Batched matching time is attributed to files in proportion to text length
+    total_chars = sum(len(p["text"]) for p in parsed) or 1
+    for source, entry, entry_skills in zip(sources, parsed, skills):
+        entry["skills"] = entry_skills
+        path = source_name(source)
+        timer.add("spacy_match", elapsed * len(entry["text"]) / total_chars,
+                  os.path.basename(path), file_extension(path))
+    return parsed
+
+
+def parse_resume(source):
+    return parse_resumes([source])[0]
+
+
+def build_resume_record(file_path, parsed, jd_skills, digest=None, jd_related=None):
+    # Only keep JD-relevant skills (fuzzy matching, precomputed in skill_index).
+    # Callers scoring many resumes pass jd_related = skill_index.related_mask(jd_skills);
+    # jd_related=-1 keeps every matched skill.
+    skill_index = get_skill_index()
+    if jd_related is None:
+        jd_related = skill_index.related_mask(jd_skills)
+    all_ids = skill_index.to_ids(parsed["skills"])
+    skill_ids = [i for i in all_ids if jd_related >> i & 1]
+    relevant_skills = skill_index.names(skill_ids)
+
+    return {
+        "id": digest,
+        "file": os.path.basename(file_path),
+        "name": parsed["name"],
+        "email": parsed["email"],
+        "phone": parsed["phone"],
+        "text": parsed["text"],
+        "skills": relevant_skills or ["No relevant skills"],
+        "skill_ids": skill_ids,                  # JD-relevant skills
+        "skill_mask": skill_index.mask(all_ids)  # every matched skill, for required-skill filters
+    }
+
+
+class ResumeRecord:
+    # Compact stand-in for build_resume_record()'s dict, used by streaming
+    # mode: no text, skill ids in an int array, fixed slots instead of a dict.
+    __slots__ = ("id", "file", "name", "email", "phone", "skill_ids", "skill_mask")
+
+    def __init__(self, file_path, parsed, digest=None, jd_related=-1):
+        skill_index = get_skill_index()
+        all_ids = skill_index.to_ids(parsed["skills"])
+        self.id = digest
+        self.file = os.path.basename(file_path)
+        self.name = parsed["name"]
+        self.email = parsed["email"]
+        self.phone = parsed["phone"]
+        self.skill_ids = array("i", (i for i in all_ids if jd_related >> i & 1))
+        self.skill_mask = skill_index.mask(all_ids)
+
+    @property
+    def skills(self):
+        return get_skill_index().names(self.skill_ids) or ["No relevant skills"]
+
+
+def _init_worker():
+    # Pool initializer: a no-op for workers forked from a preloaded parent,
+    # otherwise each worker builds (or loads from disk) its model once up front
+    get_matcher()
+
+
+def _parse_chunk(sources):
+    # Runs in a worker process: timings travel back as a plain dict
+    timer = StageTimer()
+    return parse_resumes(sources, timer=timer), timer.to_raw()
+
+
+def resolve_workers(workers, n_files):
+    # None/0 -> one worker per core; never more workers than files
+    if not workers or workers < 0:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, n_files))
+
+
+def list_resume_files(folder_path):
+    # Sorted so serial and parallel runs return resumes in the same order
+    return sorted(os.path.join(folder_path, f) for f in os.listdir(folder_path)
+                  if f.lower().endswith(RESUME_EXTENSIONS))
+
+
+def resolve_sources(sources):
+    # A folder is scanned; an explicit list of paths / (filename, bytes) pairs
+    # is used as given, minus files of a type that cannot be parsed
+    if isinstance(sources, (str, os.PathLike)):
+        return list_resume_files(sources)
+    return [source for source in sources if allowed_file(source_name(source))]
+
+
+def make_parse_pool(workers):
+    # A pool to reuse across many parse_sources() calls (batch runs); each
+    # worker loads the model once
+    return ProcessPoolExecutor(max_workers=resolve_workers(workers, os.cpu_count() or 1),
+                               initializer=_init_worker)
+
+
+def _parse_files(files, workers, chunksize, advance, timer, pool=None):
+    workers = resolve_workers(workers, len(files))
+    if workers == 1:
+        parsed = []
+        for i in range(0, len(files), SPACY_BATCH_SIZE):
+            parsed.extend(parse_resumes(files[i:i + SPACY_BATCH_SIZE], timer=timer))
+            advance(min(SPACY_BATCH_SIZE, len(files) - i))
+        return parsed
+
+    # Small chunks keep all workers busy when file sizes are uneven,
+    # but each chunk should still amortise the IPC round trip.
+    if not chunksize:
+        chunksize = max(1, min(32, len(files) // (workers * 4)))
+    chunks = [files[i:i + chunksize] for i in range(0, len(files), chunksize)]
+
+    parsed = []
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    try:
+        # map() yields chunk results in submission order -> deterministic output
+        for chunk_result, chunk_timings in pool.map(_parse_chunk, chunks):
+            parsed.extend(chunk_result)
+            timer.merge(chunk_timings)
+            advance(len(chunk_result))
+    finally:
+        if own_pool:
+            pool.shutdown()
+    return parsed
+
+
+def parse_sources(files, workers=1, chunksize=None, cache=None, on_progress=None, timer=None, pool=None,
+                  show_progress=True, with_digests=False):
+    # JD-independent half of process_resumes: returns (digests, parsed) for a
+    # list of sources, reading from / writing to the cache where possible.
+    # pool: an existing make_parse_pool() executor to reuse.
+    # Digests are None unless there is a cache or with_digests is set.
+    if timer is None:
+        timer = StageTimer()
+    with timer.stage("cache_lookup"):
+        with_digests = with_digests or cache is not None
+        digests = [source_digest(f) for f in files] if with_digests else [None] * len(files)
+        parsed = [cache.get(d) for d in digests] if cache is not None else [None] * len(files)
+    misses = [i for i, p in enumerate(parsed) if p is None]
+
+    done = len(files) - len(misses)
+    with tqdm(total=len(files), initial=done, desc="📄 Processing resumes", disable=not show_progress) as progress:
+        def advance(n):
+            nonlocal done
+            done += n
+            progress.update(n)
+            if on_progress:
+                on_progress("parsing", done, len(files))
+
+        advance(0)
+        fresh = _parse_files([files[i] for i in misses], workers, chunksize, advance, timer, pool)
+    for i, entry in zip(misses, fresh):
+        parsed[i] = entry
+        if cache is not None:
+            cache.put(digests[i], entry)
+    return digests, parsed
+
+
+# Streaming mode parses this many files at a time, so only one block's
+# extracted text is ever in memory.
+STREAM_BLOCK = 256
+
+def iter_parse_sources(files, workers=1, chunksize=None, cache=None, on_progress=None, timer=None, pool=None,
+                       show_progress=True, block=STREAM_BLOCK, with_digests=False):
+    # Streaming parse_sources(): yields (digest, parsed) per source, in order,
+    # one block at a time.
+    if timer is None:
+        timer = StageTimer()
+    own_pool = pool is None and resolve_workers(workers, len(files)) > 1
+    if own_pool:
+        pool = make_parse_pool(workers)
+    done = 0
+    try:
+        with tqdm(total=len(files), desc="📄 Processing resumes", disable=not show_progress) as progress:
+            def advance(n):
+                nonlocal done
+                done += n
+                progress.update(n)
+                if on_progress:
+                    on_progress("parsing", done, len(files))
+
+            advance(0)
+            for start in range(0, len(files), block):
+                chunk = files[start:start + block]
+                digests, parsed = parse_sources(chunk, workers, chunksize, cache, timer=timer, pool=pool,
+                                                show_progress=False, with_digests=with_digests)
+                advance(len(chunk))
+                yield from zip(digests, parsed)
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+
+def process_resumes(sources, jd_skills, workers=1, chunksize=None, cache=None, on_progress=None, timer=None,
+                    with_digests=False):
+    # sources: a folder, or a list of file paths / (filename, bytes) pairs.
+    # on_progress(stage, done, total) is called as files finish parsing.
+    # timer: optional metrics.StageTimer collecting per-stage timings.
+    # with_digests: fill in record ids (content hashes) even without a cache,
+    #               e.g. for a persistent index.
+    if timer is None:
+        timer = StageTimer()
+    files = resolve_sources(sources)
+    digests, parsed = parse_sources(files, workers, chunksize, cache, on_progress, timer,
+                                    with_digests=with_digests)
+
+    with timer.stage("jd_filter"):
+        jd_related = get_skill_index().related_mask(jd_skills)
+        return [build_resume_record(source_name(f), p, jd_skills, digest=d, jd_related=jd_related)
+                for f, p, d in zip(files, parsed, digests)]
 
 
 # =============================
 # 🔟 Rank Resumes (TF-IDF + Skill Overlap)
 # =============================
-def rank_resumes(resumes, jd_text, jd_skills):
+SKILL_OVERLAP_WEIGHT = 0.05
+
+def index_key(resume_id, text):
+    # Documents in a persistent index are keyed by content: the file digest,
+    # or a digest of the cleaned text for records built without one. Never by
+    # file name, which different resumes can share.
+    return resume_id or hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def select_top_k(scores, k=None):
+    # Indices of the k best scores, best first (ties keep input order).
+    # Finding the k-th best score is O(n); only the k survivors are sorted.
+    n = len(scores)
+    if k is None or k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.array([], dtype=np.intp)
+    # Everything above the k-th best score, then the earliest of the entries
+    # tied with it (argpartition alone picks arbitrary ones)
+    kth = -np.partition(-scores, k - 1)[k - 1]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:k - len(above)]
+    top = np.concatenate([above, ties])
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def rank_resumes(resumes, jd_text, jd_skills, index=None, k=None, required_skills=None, timer=None):
+    # k: only return the k best candidates.
+    # required_skills: candidates missing any of these are dropped before TF-IDF scoring.
+    if timer is None:
+        timer = StageTimer()
+    skill_index = get_skill_index()
+    if required_skills:
+        with timer.stage("prefilter"):
+            required = skill_index.required_mask(required_skills)
+            resumes = [r for r in resumes if r["skill_mask"] & required == required]
+    if not resumes:
+        return []
+
     jd_clean = clean_text(jd_text)
-    corpus = [jd_clean] + [r["text"] for r in resumes]
 
-    vectorizer = TfidfVectorizer(stop_words='english')
-    tfidf_matrix = vectorizer.fit_transform(corpus)
-    similarities = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:]).flatten()
+    if index is not None:
+        # Persistent index: no refit, just one transform + mat-vec.
+        # Resumes the index hasn't seen yet are added on the fly.
+        with timer.stage("index_update"):
+            doc_ids = [index_key(r["id"], r["text"]) for r in resumes]
+            for doc_id, r in zip(doc_ids, resumes):
+                if doc_id not in index:
+                    index.add(doc_id, r["text"])
+        with timer.stage("similarity"):
+            similarities = index.scores(jd_clean, doc_ids)
+    else:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
+        corpus = [jd_clean] + [r["text"] for r in resumes]
 
-    ranked_output = []
-    for i, (r, score) in enumerate(sorted(zip(resumes, similarities), key=lambda x: x[1], reverse=True)):
-        # Skill overlap weighting
-        overlap = len(set(r["skills"]) & set(jd_skills))
-        weighted_score = score + (0.05 * overlap)
+        with timer.stage("tfidf_fit"):
+            vectorizer = TfidfVectorizer(stop_words='english')
+            tfidf_matrix = vectorizer.fit_transform(corpus)
+        with timer.stage("similarity"):
+            similarities = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:]).flatten()
 
+    # Skill overlap weighting, for all candidates at once; ranking is on the final score
+    with timer.stage("skill_overlap"):
+        jd_vector = skill_index.vector(skill_index.to_ids(jd_skills))
+        overlap = skill_index.incidence([r["skill_ids"] for r in resumes]) @ jd_vector
+        scores = np.asarray(similarities, dtype=np.float64) + SKILL_OVERLAP_WEIGHT * overlap
+
+    with timer.stage("sort"):
+        top = select_top_k(scores, k)
+
+    ranked_output = []
+    for rank, i in enumerate(top, start=1):
+        r = resumes[i]
         ranked_output.append({
-            "rank": i + 1,
+            "rank": rank,
+            "id": r["id"],
             "name": r["name"],
             "email": r["email"],
             "phone": r["phone"],
             "basename": r["file"],
-            "score": round(float(weighted_score), 3),
+            "score": round(float(scores[i]), 3),
             "skills": r["skills"]
         })
     return ranked_output
 
 
+def _per_jd_tfidf_similarities(jd_cleans, texts, timer):
+    # (JDs x resumes) cosine similarities, each JD scored exactly as if
+    # rank_resumes had fitted TF-IDF on that JD plus the resumes: the resume
+    # document frequencies are shared and every JD's IDF adds 1 to its own
+    # terms only, so JDs in the same batch never change each other's scores.
+    from sklearn.feature_extraction.text import CountVectorizer
+    import scipy.sparse as sp
+    n_jds = len(jd_cleans)
+    with timer.stage("tfidf_fit"):
+        counts = CountVectorizer(stop_words='english').fit_transform(jd_cleans + texts).tocsr().astype(np.float64)
+        docs = counts[n_jds:]
+        n = docs.shape[0] + 1
+        doc_df = np.bincount(docs.indices, minlength=counts.shape[1])
+        idf = np.log((1 + n) / (1 + doc_df)) + 1          # smooth idf without the JD
+        jd = counts[:n_jds].tocoo()
+        jd_idf = np.log((1 + n) / (2 + doc_df[jd.col])) + 1  # the JD's own terms
+    with timer.stage("similarity"):
+        shape = (n_jds, counts.shape[1])
+        weights = jd.data * jd_idf
+        jd_norms = np.sqrt(np.bincount(jd.row, weights ** 2, minlength=n_jds))
+        jd_norms[jd_norms == 0] = 1.0
+        # Resume weights are counts x idf, with the JD's terms re-weighted per JD
+        query = sp.csr_matrix((weights / jd_norms[jd.row] * jd_idf, (jd.row, jd.col)), shape=shape)
+        dots = (docs @ query.T).T.toarray()
+        squares = docs.multiply(docs).tocsr()
+        norm_fix = sp.csr_matrix((jd_idf ** 2 - idf[jd.col] ** 2, (jd.row, jd.col)), shape=shape)
+        doc_norms = np.sqrt(np.maximum((squares @ idf ** 2)[None, :] + (squares @ norm_fix.T).T.toarray(), 0))
+        return np.divide(dots, doc_norms, out=np.zeros_like(dots), where=doc_norms > 0)
+
+
+def rank_resumes_multi(resumes, jd_texts, jd_skills_list, index=None, k=None, required_skills=None, timer=None):
+    # One ranking per JD, in the order of jd_texts. resumes must be
+    # JD-independent records (skill_ids = every matched skill, e.g. from
+    # build_resume_record(..., jd_related=-1)); the per-JD relevant skills are
+    # picked when the output rows are built. All JD x resume similarities come
+    # from one term count (or one index lookup) and a few sparse products;
+    # each JD's scores match rank_resumes for that JD alone, whatever else is
+    # in the batch. Skill overlap is one (resumes x skills) @ (skills x JDs) product.
+    if timer is None:
+        timer = StageTimer()
+    skill_index = get_skill_index()
+    if required_skills:
+        with timer.stage("prefilter"):
+            required = skill_index.required_mask(required_skills)
+            resumes = [r for r in resumes if r["skill_mask"] & required == required]
+    if not resumes:
+        return [[] for _ in jd_texts]
+
+    jd_cleans = [clean_text(jd) for jd in jd_texts]
+    n_jds = len(jd_cleans)
+
+    if index is not None:
+        with timer.stage("index_update"):
+            doc_ids = [index_key(r["id"], r["text"]) for r in resumes]
+            for doc_id, r in zip(doc_ids, resumes):
+                if doc_id not in index:
+                    index.add(doc_id, r["text"])
+        with timer.stage("similarity"):
+            similarities = index.scores_many(jd_cleans, doc_ids)
+    else:
+        similarities = _per_jd_tfidf_similarities(jd_cleans, [r["text"] for r in resumes], timer)
+
+    with timer.stage("skill_overlap"):
+        jd_ids = [skill_index.to_ids(jd_skills) for jd_skills in jd_skills_list]
+        resume_skills = skill_index.incidence([r["skill_ids"] for r in resumes])
+        overlap = (resume_skills @ skill_index.incidence(jd_ids).T).T.toarray()
+        scores = np.asarray(similarities, dtype=np.float64) + SKILL_OVERLAP_WEIGHT * overlap
+
+    rankings = []
+    for j in range(n_jds):
+        with timer.stage("sort"):
+            top = select_top_k(scores[j], k)
+        jd_related = skill_index.related_mask(jd_skills_list[j])
+        ranked_output = []
+        for rank, i in enumerate(top, start=1):
+            r = resumes[i]
+            relevant = skill_index.names([s for s in r["skill_ids"] if jd_related >> s & 1])
+            ranked_output.append({
+                "rank": rank,
+                "id": r["id"],
+                "name": r["name"],
+                "email": r["email"],
+                "phone": r["phone"],
+                "basename": r["file"],
+                "score": round(float(scores[j, i]), 3),
+                "skills": relevant or ["No relevant skills"]
+            })
+        rankings.append(ranked_output)
+    return rankings
+
+
+def rank_resume_stream(entries, jd_text, jd_skills, index=None, k=None, required_skills=None, timer=None):
+    # Memory-bounded rank_resumes: entries yields (file_path, digest, parsed)
+    # as files are parsed. Each document's term counts go straight into a
+    # ResumeIndex and only a ResumeRecord is kept, so no text outlives its
+    # parse block. Without an index the JD is indexed as one more document,
+    # which gives exactly the scores of rank_resumes' TF-IDF refit.
+    if timer is None:
+        timer = StageTimer()
+    from resume_index import ResumeIndex
+    skill_index = get_skill_index()
+    jd_related = skill_index.related_mask(jd_skills)
+    required = skill_index.required_mask(required_skills or [])
+    jd_clean = clean_text(jd_text)
+    own_index = index is None
+    if own_index:
+        index = ResumeIndex()
+        index.add(-1, jd_clean)
+
+    resumes, doc_ids = [], []
+    for file_path, digest, parsed in entries:
+        record = ResumeRecord(file_path, parsed, digest, jd_related)
+        if record.skill_mask & required != required:
+            continue
+        start = time.perf_counter()
+        # A private index is keyed by position, so duplicate files count twice like in a refit
+        doc_id = len(resumes) if own_index else index_key(record.id, parsed["text"])
+        if doc_id not in index:
+            index.add(doc_id, parsed["text"])
+        timer.add("index_update", time.perf_counter() - start)
+        resumes.append(record)
+        doc_ids.append(doc_id)
+    if not resumes:
+        return []
+
+    with timer.stage("similarity"):
+        similarities = index.scores(jd_clean, doc_ids)
+    with timer.stage("skill_overlap"):
+        jd_vector = skill_index.vector(skill_index.to_ids(jd_skills))
+        overlap = skill_index.incidence([r.skill_ids for r in resumes]) @ jd_vector
+        scores = np.asarray(similarities, dtype=np.float64) + SKILL_OVERLAP_WEIGHT * overlap
+
+    with timer.stage("sort"):
+        top = select_top_k(scores, k)
+
+    ranked_output = []
+    for rank, i in enumerate(top, start=1):
+        r = resumes[i]
+        ranked_output.append({
+            "rank": rank,
+            "id": r.id,
+            "name": r.name,
+            "email": r.email,
+            "phone": r.phone,
+            "basename": r.file,
+            "score": round(float(scores[i]), 3),
+            "skills": r.skills
+        })
+    return ranked_output
+
+
 # =============================
 # 1️⃣1️⃣ Main API for Flask
 # =============================
-def rank_uploaded_resumes(upload_folder, jd_text):
-    jd_clean = clean_text(jd_text)
-    jd_skills = extract_skills_from_text(jd_clean, matcher)
+def rank_uploaded_resumes(sources, jd_text, workers=1, cache=None, index=None, on_progress=None,
+                          k=None, required_skills=None, timer=None, streaming=False):
+    # sources: upload folder, or an explicit list of paths / (filename, bytes) pairs
+    # streaming: vectorise resumes block by block as they are parsed instead
+    #            of holding every resume's text (same ranking, bounded memory)
+    if timer is None:
+        timer = StageTimer()
+    with timer.stage("jd_skills"):
+        jd_clean = clean_text(jd_text)
+        jd_skills = extract_skills_from_text(jd_clean)
+
+    if streaming:
+        files = resolve_sources(sources)
+        if not files:
+            print("⚠ No resumes found in upload folder.")
+            return []
+        parsed = iter_parse_sources(files, workers=workers, cache=cache, on_progress=on_progress, timer=timer,
+                                    with_digests=index is not None)
+        entries = ((source_name(f), d, p) for f, (d, p) in zip(files, parsed))
+        ranked = rank_resume_stream(entries, jd_text, jd_skills, index=index, k=k,
+                                    required_skills=required_skills, timer=timer)
+        if on_progress:
+            on_progress("ranking", len(files), len(files))
+        print(f"✅ Processed {len(files)} resumes successfully.")
+        return ranked
 
-    resumes = process_resumes(upload_folder, jd_skills)
+    resumes = process_resumes(sources, jd_skills, workers=workers, cache=cache, on_progress=on_progress,
+                              timer=timer, with_digests=index is not None)
     if not resumes:
         print("⚠ No resumes found in upload folder.")
         return []
 
-    ranked = rank_resumes(resumes, jd_text, jd_skills)
-    print(f"✅ Processed {len(ranked)} resumes successfully.")
+    if on_progress:
+        on_progress("ranking", 0, len(resumes))
+    ranked = rank_resumes(resumes, jd_text, jd_skills, index=index, k=k, required_skills=required_skills,
+                          timer=timer)
+    if on_progress:
+        on_progress("ranking", len(resumes), len(resumes))
+    print(f"✅ Processed {len(resumes)} resumes successfully.")
     return ranked
 
 
+def rank_multiple_jds(sources, jd_texts, workers=1, cache=None, index=None, on_progress=None,
+                      k=None, required_skills=None, timer=None):
+    # Ranks the same resumes against several JDs: every resume is parsed once
+    # and all JDs are scored together. Returns one ranking per JD, in order.
+    if timer is None:
+        timer = StageTimer()
+    jd_texts = list(jd_texts)
+    with timer.stage("jd_skills"):
+        jd_skills_list = [extract_skills_from_text(clean_text(jd)) for jd in jd_texts]
+
+    files = resolve_sources(sources)
+    digests, parsed = parse_sources(files, workers=workers, cache=cache, on_progress=on_progress, timer=timer,
+                                    with_digests=index is not None)
+    with timer.stage("jd_filter"):
+        # JD-independent records: relevant skills are chosen per JD when ranking
+        resumes = [build_resume_record(source_name(f), p, [], digest=d, jd_related=-1)
+                   for f, p, d in zip(files, parsed, digests)]
+    if not resumes:
+        print("⚠ No resumes found in upload folder.")
+        return [[] for _ in jd_texts]
+
+    if on_progress:
+        on_progress("ranking", 0, len(resumes))
+    rankings = rank_resumes_multi(resumes, jd_texts, jd_skills_list, index=index, k=k,
+                                  required_skills=required_skills, timer=timer)
+    if on_progress:
+        on_progress("ranking", len(resumes), len(resumes))
+    print(f"✅ Processed {len(resumes)} resumes against {len(jd_texts)} job descriptions.")
+    return rankings
+
+
@@ -0,0 +1,94 @@
+# test_batch_screen.py
+# Crash/resume behaviour of the batch screening checkpoints.
+import csv
+import os
+import zipfile
+
+import pytest
+
+import batch_screen
+from batch_screen import Checkpoint, ingest, screen_corpus
+
+SKILLS = ["python", "sql", "docker", "java", "excel", "aws", "react", "pandas"]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    folder = tmp_path / "resumes"
+    folder.mkdir()
+    for i in range(50):
+        skills = " ".join(SKILLS[j % len(SKILLS)] for j in range(i % 5 + 1, i % 5 + 4))
+        (folder / f"r{i:02d}.txt").write_text(f"Candidate {i}\ncand{i}@mail.com\nengineer with {skills} {i}\n")
+    return str(folder)
+
+
+def rows(path):
+    with open(path, encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def run(corpus, state, out, chunk=16):
+    checkpoint = Checkpoint(state, corpus)
+    checkpoint.load()
+    ingest(corpus, checkpoint, workers=1, chunk_size=chunk)
+    return screen_corpus(checkpoint, [("jd_00", "python sql docker engineer")], out)[0]
+
+
+def crash_on_save(monkeypatch, after):
+    # The index write of the (after + 1)-th checkpoint fails halfway through
+    calls = {"n": 0}
+    save_delta = batch_screen.ResumeIndex.save_delta
+
+    def failing_save_delta(self, path, doc_ids, first_term):
+        calls["n"] += 1
+        if calls["n"] > after:
+            save_delta(self, path, doc_ids, first_term)
+            raise RuntimeError("simulated crash")
+        return save_delta(self, path, doc_ids, first_term)
+    monkeypatch.setattr(batch_screen.ResumeIndex, "save_delta", failing_save_delta)
+
+
+@pytest.mark.parametrize("crash_after", [0, 1], ids=["before_first_checkpoint", "after_first_checkpoint"])
+def test_resume_after_crash_matches_full_run(corpus, tmp_path, monkeypatch, crash_after):
+    expected = rows(run(corpus, str(tmp_path / "full_state"), str(tmp_path / "full")))
+    state, out = str(tmp_path / "state"), str(tmp_path / "out")
+    with monkeypatch.context() as m:
+        crash_on_save(m, crash_after)
+        with pytest.raises(RuntimeError):
+            run(corpus, state, out)
+    run(corpus, state, out)
+    got = rows(run(corpus, state, out))  # a second resume must not add anything either
+    assert len(got) == 50
+    assert got == expected
+
+
+def test_resume_from_zip_skips_consumed_members(corpus, tmp_path, monkeypatch):
+    archive = str(tmp_path / "resumes.zip")
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name in sorted(os.listdir(corpus)):
+            zf.write(os.path.join(corpus, name), name)
+    expected = rows(run(archive, str(tmp_path / "full_state"), str(tmp_path / "full")))
+    state, out = str(tmp_path / "state"), str(tmp_path / "out")
+    with monkeypatch.context() as m:
+        crash_on_save(m, 1)
+        with pytest.raises(RuntimeError):
+            run(archive, state, out)
+
+    read = zipfile.ZipFile.read
+    names = []
+
+    def counting_read(self, name, *args):
+        names.append(getattr(name, "filename", name))
+        return read(self, name, *args)
+    monkeypatch.setattr(zipfile.ZipFile, "read", counting_read)
+    assert rows(run(archive, state, out)) == expected
+    assert names == sorted(os.listdir(corpus))[16:]
+
+
+def test_load_discards_docs_without_checkpoint(tmp_path):
+    state = tmp_path / "state"
+    state.mkdir()
+    (state / "docs.jsonl").write_text('{"id": "x"}\n')
+    checkpoint = Checkpoint(str(state), str(tmp_path))
+    assert not checkpoint.load()
+    assert not os.path.exists(state / "docs.jsonl")
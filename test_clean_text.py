@@ -0,0 +1,42 @@
+# test_clean_text.py
+# Golden-output checks: clean_text and extract_contact_info must return
+# exactly what the original implementations (kept in benchmark.py) did.
+# Timing lives in `python benchmark.py clean`.
+import random
+
+import pytest
+
+from benchmark import EDGE_TOKENS, FILLER_WORDS, legacy_clean_text, legacy_extract_contact_info, raw_resume_texts
+from resume_ranker import clean_text, extract_contact_info
+
+# The legacy implementation hands URL-only strings to BeautifulSoup on purpose
+pytestmark = pytest.mark.filterwarnings("ignore::bs4.MarkupResemblesLocatorWarning")
+
+
+def edge_case_texts(n, seed=0):
+    # Short strings dense with emails, URLs, markup, entities and unicode
+    rng = random.Random(seed)
+    pool = EDGE_TOKENS + FILLER_WORDS + ["Jane Doe", "\n", " ", "<div>", "a<b", "x & y", "mail@", "@home"]
+    return ["".join(rng.choice(pool) + rng.choice(["", " ", "\n"]) for _ in range(rng.randint(0, 12)))
+            for _ in range(n)]
+
+
+RESUMES = raw_resume_texts(300)
+EDGE_CASES = edge_case_texts(2000)
+
+
+@pytest.mark.parametrize("texts", [RESUMES, EDGE_CASES, EDGE_TOKENS], ids=["resumes", "edge_cases", "tokens"])
+def test_clean_text_matches_legacy(texts):
+    for text in texts:
+        assert clean_text(text) == legacy_clean_text(text), repr(text)
+
+
+@pytest.mark.parametrize("texts", [RESUMES, EDGE_CASES], ids=["resumes", "edge_cases"])
+def test_extract_contact_info_matches_legacy(texts):
+    for text in texts:
+        assert extract_contact_info(text) == legacy_extract_contact_info(text), repr(text)
+
+
+@pytest.mark.parametrize("value", [None, 42, b"bytes"])
+def test_clean_text_non_string(value):
+    assert clean_text(value) == legacy_clean_text(value) == ""
@@ -0,0 +1,48 @@
+# test_ranking.py
+# Multi-JD ranking must give every JD the ranking it gets on its own, and
+# top-k selection must agree with the full ranking.
+import numpy as np
+import pytest
+
+from resume_ranker import rank_multiple_jds, rank_uploaded_resumes, select_top_k
+
+SKILLS = ["python", "sql", "docker", "java", "excel", "aws", "react", "pandas"]
+JDS = [
+    "Backend engineer: python, sql and docker, some aws",
+    "Frontend developer with react and java experience",
+    "Data analyst, excel and pandas, python a plus",
+    "",                          # empty JD
+    "zzyzx qwfp blorft",         # no term in common with any resume
+]
+
+
+@pytest.fixture(scope="module")
+def sources():
+    resumes = []
+    for i in range(40):
+        skills = " ".join(SKILLS[j % len(SKILLS)] for j in range(i % 7, i % 7 + 1 + i % 3))
+        text = f"Candidate {i}\ncand{i}@mail.com\n{skills} engineer, {i % 4} years of {SKILLS[i % 8]}\n"
+        resumes.append((f"r{i:02d}.txt", text.encode()))
+    return resumes
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"k": 5}, {"required_skills": ["python"]}],
+                         ids=["all", "top_k", "required_skills"])
+def test_multi_jd_matches_single_jd(sources, kwargs):
+    multi = rank_multiple_jds(sources, JDS, **kwargs)
+    assert len(multi) == len(JDS)
+    for jd, ranking in zip(JDS, multi):
+        assert ranking == rank_uploaded_resumes(sources, jd, **kwargs), jd
+
+
+def test_multi_jd_independent_of_batch(sources):
+    assert rank_multiple_jds(sources, JDS[:1]) == rank_multiple_jds(sources, JDS)[:1]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_select_top_k_is_prefix_with_ties(seed):
+    # Few distinct values, so most of the k-th best scores are tied
+    scores = np.random.default_rng(seed).integers(0, 4, size=200).astype(np.float64) / 4
+    full = select_top_k(scores)
+    for k in (0, 1, 7, 50, 199, 200, 300):
+        assert select_top_k(scores, k).tolist() == full[:k].tolist()
@@ -0,0 +1,241 @@
+# text_extractors.py
+# Streaming, budgeted text extraction for resume files.
+#
+# Each format has an extractor plugin: a generator that yields the document
+# one page (PDF) or paragraph (DOCX) at a time, so extraction can stop as
+# soon as the page/character budget is used up instead of materialising a
+# 300-page scan. Binary formats can additionally be run in an isolated,
+# long-lived child process with a wall-clock timeout, so one pathological
+# file cannot stall a whole batch.
+#
+# Every function takes the file name (used for the format) plus optional
+# in-memory `data`; when data is given nothing is read from disk.
+import io
+import multiprocessing
+import os
+import threading
+
+DEFAULT_MAX_PAGES = 5          # resumes rarely need more
+DEFAULT_MAX_CHARS = 100_000
+PDF_BACKEND = os.environ.get("RESUME_PDF_BACKEND", "auto")  # auto | pypdf2 | pdfplumber
+
+EXTRACTORS = {}
+
+
+def register_extractor(*extensions, separator=" ", paged=False, isolate=False, preload=None):
+    # paged:   segments are pages, so max_pages applies
+    # isolate: run in a child process when a timeout is requested
+    # preload: imports the parser library before forking that child, so
+    #          every child doesn't pay the import again
+    def decorator(func):
+        func.separator = separator
+        func.paged = paged
+        func.isolate = isolate
+        func.preload = preload
+        for ext in extensions:
+            EXTRACTORS[ext] = func
+        return func
+    return decorator
+
+
+def file_extension(file_path):
+    return file_path.rsplit('.', 1)[-1].lower() if '.' in file_path else ""
+
+
+def get_extractor(file_path):
+    # Unknown extensions are read as plain text, like before
+    return EXTRACTORS.get(file_extension(file_path), iter_text_chunks)
+
+
+def open_binary(file_path, data=None):
+    return io.BytesIO(data) if data is not None else open(file_path, "rb")
+
+
+def open_text(file_path, data=None):
+    if data is not None:
+        return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="ignore")
+    return open(file_path, "r", encoding="utf-8", errors="ignore")
+
+
+# =============================
+# Extractor plugins
+# =============================
+def _iter_pdf_pypdf2(file_path, data=None):
+    import PyPDF2
+    with open_binary(file_path, data) as f:
+        reader = PyPDF2.PdfReader(f)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
+
+def _iter_pdf_pdfplumber(file_path, data=None):
+    import pdfplumber
+    with open_binary(file_path, data) as f, pdfplumber.open(f) as pdf:
+        for page in pdf.pages:
+            yield page.extract_text() or ""
+            page.close()  # drop the page's parsed layout objects
+
+
+def pdf_backend():
+    if PDF_BACKEND != "auto":
+        return PDF_BACKEND
+    try:
+        import PyPDF2  # noqa: F401
+        return "pypdf2"
+    except ImportError:
+        return "pdfplumber"
+
+
+def _preload_pdf():
+    if pdf_backend() == "pdfplumber":
+        import pdfplumber  # noqa: F401
+    else:
+        import PyPDF2  # noqa: F401
+
+
+def _preload_docx():
+    import docx  # noqa: F401
+
+
+@register_extractor("pdf", paged=True, isolate=True, preload=_preload_pdf)
+def iter_pdf_pages(file_path, data=None):
+    if pdf_backend() == "pdfplumber":
+        yield from _iter_pdf_pdfplumber(file_path, data)
+    else:
+        yield from _iter_pdf_pypdf2(file_path, data)
+
+
+@register_extractor("docx", isolate=True, preload=_preload_docx)
+def iter_docx_paragraphs(file_path, data=None):
+    from docx import Document
+    with open_binary(file_path, data) as f:
+        paragraphs = Document(f).paragraphs
+    for p in paragraphs:
+        yield p.text
+
+
+@register_extractor("html", "htm", separator="")
+def iter_html_text(file_path, data=None):
+    from bs4 import BeautifulSoup
+    with open_text(file_path, data) as f:
+        yield BeautifulSoup(f.read(), "html.parser").get_text("\n")
+
+
+@register_extractor("txt", separator="")
+def iter_text_chunks(file_path, data=None, chunk_size=64 * 1024):
+    with open_text(file_path, data) as f:
+        for chunk in iter(lambda: f.read(chunk_size), ""):
+            yield chunk
+
+
+# =============================
+# Budgeted extraction
+# =============================
+def iter_text(file_path, max_pages=DEFAULT_MAX_PAGES, max_chars=DEFAULT_MAX_CHARS, data=None):
+    # Yields text segments until the page or character budget is exhausted
+    extractor = get_extractor(file_path)
+    gap = len(extractor.separator)  # joined between segments, so it counts too
+    pages = chars = 0
+    for segment in extractor(file_path, data):
+        if pages:
+            chars += gap
+        if max_chars and chars + len(segment) > max_chars:
+            if chars < max_chars:
+                yield segment[:max_chars - chars]
+            return
+        yield segment
+        chars += len(segment)
+        pages += 1
+        if extractor.paged and max_pages and pages >= max_pages:
+            return
+
+
+def _extract(file_path, max_pages, max_chars, data):
+    return get_extractor(file_path).separator.join(iter_text(file_path, max_pages, max_chars, data))
+
+
+def _worker_loop(conn):
+    # Long-lived extraction process: one request at a time until the parent hangs up
+    while True:
+        try:
+            file_path, max_pages, max_chars, data = conn.recv()
+        except EOFError:
+            break
+        try:
+            conn.send((True, _extract(file_path, max_pages, max_chars, data)))
+        except Exception as e:
+            conn.send((False, repr(e)))
+    conn.close()
+
+
+class ExtractionWorker:
+    # A child process reused for many files. It is only replaced when a file
+    # times out or kills it, so the fork is paid once per process, not per file.
+    def __init__(self):
+        for extractor in set(EXTRACTORS.values()):
+            if extractor.isolate and extractor.preload:
+                extractor.preload()  # imported once here instead of in every replacement
+        self.pid = os.getpid()
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.proc = multiprocessing.Process(target=_worker_loop, args=(child_conn,), daemon=True)
+        self.proc.start()
+        child_conn.close()
+
+    def extract(self, file_path, max_pages, max_chars, data, timeout):
+        self.conn.send((file_path, max_pages, max_chars, data))
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"extraction took longer than {timeout}s")
+        return self.conn.recv()
+
+    def close(self):
+        if self.proc.is_alive():
+            self.proc.terminate()
+        self.proc.join()
+        self.conn.close()
+
+
+# Idle workers of this process; concurrent callers (job threads) each check
+# one out, so extractions never queue behind each other
+_idle_workers = []
+_idle_lock = threading.Lock()
+_idle_pid = None
+
+
+def _checkout_worker():
+    global _idle_pid
+    with _idle_lock:
+        if _idle_pid != os.getpid():
+            # Forked from a process that had workers: those belong to the parent
+            _idle_workers.clear()
+            _idle_pid = os.getpid()
+        if _idle_workers:
+            return _idle_workers.pop()
+    return ExtractionWorker()
+
+
+def _checkin_worker(worker):
+    with _idle_lock:
+        if worker.pid == os.getpid():
+            _idle_workers.append(worker)
+
+
+def _extract_isolated(file_path, max_pages, max_chars, data, timeout):
+    worker = _checkout_worker()
+    try:
+        ok, payload = worker.extract(file_path, max_pages, max_chars, data, timeout)
+    except EOFError:
+        worker.close()
+        raise RuntimeError("extraction process died")
+    except BaseException:
+        worker.close()  # timed out (or interrupted): the child may still be busy
+        raise
+    _checkin_worker(worker)
+    if not ok:
+        raise RuntimeError(payload)
+    return payload
+
+
+def extract_text(file_path, max_pages=DEFAULT_MAX_PAGES, max_chars=DEFAULT_MAX_CHARS, timeout=None, data=None):
+    if timeout and get_extractor(file_path).isolate:
+        return _extract_isolated(file_path, max_pages, max_chars, data, timeout)
+    return _extract(file_path, max_pages, max_chars, data)